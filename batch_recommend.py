@@ -0,0 +1,196 @@
+'''
+Offline recommendation runner for large SteamID lists.
+
+    python batch_recommend.py steamids.txt -o recommendations.jsonl
+    cat steamids.txt | python batch_recommend.py - -o recommendations.jsonl --workers 4
+
+Reads one SteamID per line (blank lines and # comments are skipped), fetches the libraries through the
+shared rate limiter (background priority), scores them in a process pool against the catalog snapshot
+loaded at start (read-only, inherited by the workers) and appends one JSON object per user to the output,
+the same structure as Profiler.recommend_batch() (or {'steamid', 'error'} if the library is unavailable).
+
+Already written SteamIDs are skipped, so an interrupted run is resumed by starting it again with the same output.
+Details of apps missing from the database are not requested (SteamSpy allows ~1 request per second), the
+interactive commands fill them in over time.
+'''
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from scraper import AsyncSteamAPI
+from database import Database
+from profiler import Profiler
+from ratelimit import rate_limiter, PRIORITY_BACKGROUND
+
+
+def read_steamids(source):
+    '''
+    SteamIDs from a file or '-' (stdin), in order, without duplicates.
+    '''
+    f = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        steamids = (line.split('#', 1)[0].strip() for line in f)
+        return list(dict.fromkeys(steamid for steamid in steamids if steamid))
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def load_done(path, retry_errors: bool = False):
+    '''
+    SteamIDs already written to the output. A partly written last line (interrupted run) is cut off.
+
+    With retry_errors the error rows are removed from the output (rewritten in place), so a retried
+    SteamID ends up with exactly one row.
+    '''
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end != len(data):
+            f.truncate(end)
+
+    kept = []
+    retried = 0
+    for line in data[:end].splitlines(keepends=True):
+        try:
+            row = json.loads(line)
+        except ValueError:
+            kept.append(line)
+            continue
+        if retry_errors and 'error' in row:
+            retried += 1
+            continue
+        kept.append(line)
+        done.add(str(row.get('steamid')))
+
+    if retried:
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.writelines(kept)
+        os.replace(tmp, path)
+        print(f'Retrying {retried} users whose library was unavailable (error rows removed from {path})')
+    return done
+
+
+def _init_worker():
+    # Forked workers inherit the parent's catalog snapshot, spawned ones load their own copy once
+    Database.get_catalog()
+
+
+def _score_chunk(libraries: dict, current_time: int, limit: int):
+    '''
+    Score one chunk of users in a worker process (no network, no writes).
+    '''
+    profiler = Profiler()
+    profiler.current_time = current_time
+    catalog, results = profiler.score_users(*libraries, libraries=libraries, fetch_missing=False, limit=limit)
+    return [Profiler.structured(catalog, steamid, result, limit) for steamid, result in results.items()]
+
+
+async def fetch_libraries(steamapi, steamids):
+    '''
+    Fetch the libraries of a chunk concurrently (paced by the shared rate limiter).
+
+    Returns:
+        tuple: (dict steamid -> games, list of error rows); an empty library is not an error, it is scored
+               like any other and gets no recommendations.
+    '''
+    async def fetch(steamid):
+        try:
+            return await steamapi.get_user_library(steamid)
+        except Exception as e:
+            return e
+
+    libraries = {}
+    errors = []
+    for steamid, games in zip(steamids, await asyncio.gather(*(fetch(steamid) for steamid in steamids))):
+        if games is None or isinstance(games, Exception):
+            errors.append({'steamid': steamid, 'error': 'library unavailable (private profile or request failed)'})
+        else:
+            libraries[steamid] = games
+    return libraries, errors
+
+
+async def run(steamids, output, workers: int = None, chunk_size: int = 50, limit: int = 10):
+    '''
+    Score every SteamID and append the results to output (JSONL), see the module docstring.
+    '''
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+    current_time = int(time.time())
+
+    # Loaded before the pool starts, so forked workers share it copy-on-write
+    catalog = Database.get_catalog()
+    print(f'Catalog: {len(catalog)} items (generation {catalog.data_generation}). Users to score: {len(steamids)}')
+
+    total = len(steamids)
+    written = 0
+    started = time.monotonic()
+
+    def write(f, rows):
+        nonlocal written
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        f.flush()
+        written += len(rows)
+
+        elapsed = time.monotonic() - started
+        rate = written / elapsed if elapsed else 0
+        eta = str(timedelta(seconds=round((total - written) / rate))) if rate else '?'
+        print(f'  {written}/{total} users, {rate:.2f} users/s, ETA {eta}')
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool, open(output, 'a', encoding='utf-8') as f:
+        async with AsyncSteamAPI(priority=PRIORITY_BACKGROUND) as steamapi:
+            scoring = set()
+            for i in range(0, total, chunk_size):
+                # Fetch the next chunk while the pool scores the previous ones
+                libraries, errors = await fetch_libraries(steamapi, steamids[i:i + chunk_size])
+                if errors:
+                    write(f, errors)
+                if libraries:
+                    scoring.add(loop.run_in_executor(pool, _score_chunk, libraries, current_time, limit))
+
+                while len(scoring) > workers:
+                    done, scoring = await asyncio.wait(scoring, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        write(f, future.result())
+
+            for future in asyncio.as_completed(scoring):
+                write(f, await future)
+
+    elapsed = time.monotonic() - started
+    print('-'*40)
+    print(f'Done: {written} users in {timedelta(seconds=round(elapsed))} ({written / elapsed if elapsed else 0:.2f} users/s).')
+    rate_limiter.print_stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute recommendations for a list of SteamIDs (JSONL output, resumable).')
+    parser.add_argument('input', help="file with one SteamID per line, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='recommendations.jsonl', help='JSONL file results are appended to')
+    parser.add_argument('--workers', type=int, default=None, help='scoring processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=50, help='users per library batch and scoring task')
+    parser.add_argument('--limit', type=int, default=10, help='recommendations per user')
+    parser.add_argument('--retry-errors', action='store_true', help='score users again whose library was unavailable')
+    args = parser.parse_args(argv)
+
+    steamids = read_steamids(args.input)
+    done = load_done(args.output, args.retry_errors)
+    todo = [steamid for steamid in steamids if steamid not in done]
+    if done:
+        print(f'Resuming: {len(steamids) - len(todo)} of {len(steamids)} users already in {args.output}')
+
+    asyncio.run(run(todo, args.output, args.workers, args.chunk_size, args.limit))
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+'''
+SteamDB page parsing on the saved pages in tests/fixtures (SteamDB.parse_apps() / TagLabelParser).
+
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --rows 5000 --repeat 10
+
+The app table is repeated up to --rows rows (a full SteamDB list shows 1000). Reports the average time and the
+peak memory (tracemalloc) of one parse; while bs4 is importable the BeautifulSoup parsing SteamDB used
+before the streaming parsers is measured next to it.
+'''
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+# The modules live at the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from scraper import SteamDB, TagLabelParser
+
+try:
+    from bs4 import BeautifulSoup, Tag
+except ImportError:
+    BeautifulSoup = None
+
+
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def app_table(rows: int):
+    '''
+    The saved trending page with its table body repeated up to the given number of rows.
+    '''
+    page = fixture('steamdb_trending.html')
+    head, rest = page.split('<tbody>', 1)
+    body, tail = rest.split('</tbody>', 1)
+    count = body.count('<tr class="app"')
+    return head + '<tbody>' + body * max(1, -(-rows // count)) + '</tbody>' + tail
+
+
+def bs4_apps(html, section):
+    '''
+    SteamDB.get_page() table parsing before AppTableParser.
+    '''
+    soup = BeautifulSoup(html, 'html.parser')
+    apps = []
+    for item in soup.find_all('tr', {'class': 'app'}):
+        app = {'appid': int(item.get('data-appid', 0))}
+        for i, tag in enumerate([t for t in item if isinstance(t, Tag)]):
+            if i == 0:
+                rank = int(tag.get('data-sort', 0))
+                app['is_trending'] = rank if section == 'trending' else 0
+                app['is_toprated'] = rank if section == 'toprated' else 0
+                app['is_topselling'] = rank if section == 'topselling' else 0
+                app['is_mostwishlisted'] = rank if section == 'mostwishlisted' else 0
+            elif i == 2:
+                a_tag = tag.find('a')
+                app['name'] = a_tag.get_text(strip=True) if a_tag else ''
+            elif i == 3:
+                app['discount'] = int(tag.get('data-sort', 0))
+            elif i == 4:
+                app['price'] = int(tag.get('data-sort', -1)) if str(tag.get('data-sort', -1)).isdigit() else -1
+            elif i == 5:
+                app['rating'] = round(float(tag.get('data-sort', 0)))
+            elif i == 6:
+                app['release'] = int(tag.get('data-sort', 0))
+            elif i == 7:
+                app['follows'] = int(tag.get('data-sort', 0))
+        apps.append(app)
+    return apps
+
+
+def bs4_tags(html):
+    '''
+    SteamDB.get_tags() label parsing before TagLabelParser.
+    '''
+    soup = BeautifulSoup(html, 'html.parser')
+    tags = []
+    for item in soup.find_all('div', {'class': 'label'}):
+        a_tag = item.find('a')
+        tag_name = a_tag.get_text(strip=True).replace(a_tag.find('span').get_text(strip=True), '').strip()
+        label_count = item.find('span', class_='label-count')
+        tags.append({
+            'tag': tag_name,
+            'id': int(a_tag['href'].split('/')[2]),
+            'label_count': int(label_count.get_text(strip=True) if label_count else '0'),
+        })
+    return tags
+
+
+def parse_tags(html):
+    parser = TagLabelParser()
+    parser.feed(html)
+    parser.close()
+    return parser.tags
+
+
+def bench(name, fn, repeat: int):
+    fn()    # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{name:<28} {elapsed * 1000:>9.2f} ms  peak {peak / 1024:>9.1f} KiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the SteamDB page parsers on the saved fixtures.')
+    parser.add_argument('--rows', type=int, default=1000, help='rows of the app table')
+    parser.add_argument('--repeat', type=int, default=5, help='parses per measurement')
+    args = parser.parse_args()
+
+    table = app_table(args.rows)
+    tags = fixture('steamdb_tags.html')
+    rows = table.count('<tr class="app"')
+    print(f'App table: {rows} rows, {len(table) / 1024:.0f} KiB. Tags page: {len(tags) / 1024:.1f} KiB')
+
+    if BeautifulSoup is not None:
+        if bs4_apps(table, 'trending') != [dict(app) for app in SteamDB.parse_apps(table, 'trending')] or bs4_tags(tags) != parse_tags(tags):
+            print('Warning: the parsers disagree with BeautifulSoup on these pages')
+        bench('app table, BeautifulSoup', lambda: bs4_apps(table, 'trending'), args.repeat)
+    bench('app table, AppTableParser', lambda: SteamDB.parse_apps(table, 'trending'), args.repeat)
+
+    if BeautifulSoup is not None:
+        bench('tags, BeautifulSoup', lambda: bs4_tags(tags), args.repeat * 20)
+    bench('tags, TagLabelParser', lambda: parse_tags(tags), args.repeat * 20)
+    if BeautifulSoup is None:
+        print('bs4 is not installed, BeautifulSoup was not measured')
+
+
+if __name__ == '__main__':
+    main()
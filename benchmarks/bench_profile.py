@@ -0,0 +1,65 @@
+'''
+Profile building on synthetic big libraries (Profiler.build_profile() / Profiler.like_scores()).
+
+    python benchmarks/bench_profile.py
+    python benchmarks/bench_profile.py --sizes 1000 5000 20000 --users 5
+
+Libraries are generated like a real one: most games never or not recently played, some never launched
+(rtime_last_played 0). Times are the average per library; no network or database is used.
+'''
+import os
+import sys
+import time
+import random
+import argparse
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profiler import Profiler
+
+
+NOW = 1750000000
+DAY = 24 * 60 * 60
+
+
+def library(seed: int, size: int):
+    rng = random.Random(seed)
+    return [
+        {
+            'appid': (i + 1) * 10,
+            'name': f'Game {i}',
+            'playtime_forever': rng.choice([0, 0, rng.randint(0, 50), rng.randint(0, 20000)]),
+            'playtime_2weeks': rng.choice([0] * 8 + [rng.randint(1, 900)]),
+            'rtime_last_played': rng.choice([0, NOW - rng.randint(0, 900) * DAY]),
+        }
+        for i in range(size)
+    ]
+
+
+def bench(fn, libraries):
+    fn(libraries[0])    # warm up
+    start = time.perf_counter()
+    for games in libraries:
+        fn(games)
+    return (time.perf_counter() - start) / len(libraries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark profile building on synthetic libraries.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000], help='games per library')
+    parser.add_argument('--users', type=int, default=5, help='libraries per size')
+    args = parser.parse_args()
+
+    profiler = Profiler()
+    profiler.current_time = NOW
+
+    print(f"{'games':>8} {'like_scores':>14} {'build_profile':>15} {'per game':>10}")
+    for size in args.sizes:
+        libraries = [library(seed, size) for seed in range(args.users)]
+        scores = bench(profiler.like_scores, libraries)
+        profile = bench(lambda games: profiler.build_profile('user', libraries={'user': games}), libraries)
+        print(f'{size:>8} {scores * 1000:>11.2f} ms {profile * 1000:>12.2f} ms {profile / size * 1e6:>7.2f} µs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+import re
+import threading
+from collections import defaultdict
+
+
+TRENDING_MAX_RANK = 150     # items ranked 1..150 on SteamDB trending can be recommended
+
+# Genres (Steam store) and user tags (SteamSpy) that mark a game playable together
+MULTIPLAYER_LABELS = frozenset([
+    'Multiplayer', 'Multi-player', 'Massively Multiplayer', 'MMO', 'MMORPG',
+    'Co-op', 'Online Co-Op', 'Local Co-Op', 'Co-op Campaign', 'Split Screen',
+    'Local Multiplayer', 'Online Multi-Player', 'Asynchronous Multiplayer', '4 Player Local',
+    'PvP', 'Online PvP', 'Team-Based',
+])
+
+_NONZERO_BYTE = re.compile(rb'[^\x00]')
+
+
+class Catalog:
+    '''
+    Read-only, in-memory snapshot of the items table.
+
+    A snapshot is built once from Database.get_items() and shared by every recommendation call.
+    It is never modified in place: a refresh publishes a new Catalog with a higher generation,
+    so a caller holding an older snapshot keeps scoring against a consistent view.
+    '''
+
+    def __init__(self, items, generation: int = 0, data_generation: int = 0):
+        self.items = tuple(items)
+        self.generation = generation
+        self.data_generation = data_generation     # persisted catalog generation of the database (meta table)
+        self.by_appid = {item.appid: item for item in self.items}
+        self.position = {item.appid: i for i, item in enumerate(self.items)}
+
+        # Inverted index: genre/tag -> sorted appid posting list
+        self.index = self._build_index(self.items)
+
+        # Items that pass the trending and release filters, and their own index for candidate generation
+        self.trending = [item for item in self.items if self.is_trending_candidate(item)]
+        self.trending_index = self._build_index(self.trending)
+
+        # Bitset (int, bit i = catalog position i) of the items labelled co-op/multiplayer
+        self.multiplayer = self.bitset(item.appid for item in self.items if self.is_multiplayer(item))
+
+
+    @staticmethod
+    def _build_index(items):
+        '''
+        Build an inverted index from each genre and tag to the sorted list of appids labelled with it.
+        '''
+        index = defaultdict(list)
+        for item in items:
+            for label in set(item.genres) | set(item.tags):
+                index[label].append(item.appid)
+        return {label: sorted(appids) for label, appids in index.items()}
+
+
+    @staticmethod
+    def is_trending_candidate(item):
+        '''
+        True if the item is in the trending window and has a known release date.
+
+        The upper release bound (not released yet) depends on the current time and is checked by the caller.
+        '''
+        return 1 <= (item.is_trending or 0) <= TRENDING_MAX_RANK and (item.release or 0) > 0
+
+
+    @staticmethod
+    def is_multiplayer(item):
+        '''
+        True if any genre or tag of the item marks it as co-op/multiplayer (MULTIPLAYER_LABELS).
+        '''
+        return not MULTIPLAYER_LABELS.isdisjoint(item.genres) or not MULTIPLAYER_LABELS.isdisjoint(item.tags)
+
+
+    def bitset(self, appids):
+        '''
+        Compact set of appids as an int with the bit of each item's catalog position set (unknown appids are skipped).
+
+        Bitsets of the same snapshot are intersected with &, e.g. owned games of several users and self.multiplayer.
+        '''
+        bitmap = bytearray((len(self.items) + 7) // 8)
+        position = self.position
+        for appid in appids:
+            i = position.get(appid)
+            if i is not None:
+                bitmap[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bitmap, 'little')
+
+
+    def positions(self, bits: int):
+        '''
+        Catalog positions of the set bits of a bitset, in ascending order.
+        '''
+        data = bits.to_bytes((len(self.items) + 7) // 8, 'little')
+        # Empty bytes are skipped by the regex engine, only the non-empty ones are decoded
+        for match in _NONZERO_BYTE.finditer(data):
+            byte = data[match.start()]
+            base = match.start() << 3
+            for bit in range(8):
+                if byte >> bit & 1:
+                    yield base | bit
+
+
+    def match_counts(self, labels, trending_only: bool = False):
+        '''
+        Count for each appid how many of the given genres/tags it is labelled with.
+
+        Only the posting lists of the given labels are visited, so the cost is proportional to the matching items.
+
+        Parameters:
+            labels (list): Genres and/or tags to match.
+            trending_only (bool): Restrict matches to the precomputed trending items.
+
+        Returns:
+            dict[int, int]: appid -> match count (only appids with at least one match).
+        '''
+        index = self.trending_index if trending_only else self.index
+        counts = defaultdict(int)
+        for label in set(labels):
+            for appid in index.get(label, ()):
+                counts[appid] += 1
+        return counts
+
+
+    def get(self, appid: int):
+        '''
+        Return the item with the given appid or None.
+        '''
+        return self.by_appid.get(appid)
+
+
+    def get_items(self, ids: list = None):
+        '''
+        Same contract as Database.get_items(), served from memory.
+
+        Parameters:
+            ids (list): Optional list of app IDs to filter results. If None, returns all items.
+        Returns:
+            List of items, in the order of the requested ids (unknown ids are skipped).
+        '''
+        if not ids:
+            return list(self.items)
+        return [self.by_appid[id_] for id_ in ids if id_ in self.by_appid]
+
+
+    def merged(self, items, generation: int):
+        '''
+        Return a new snapshot with the given items added or replaced (matched by appid).
+        '''
+        by_appid = dict(self.by_appid)
+        by_appid.update((item.appid, item) for item in items)
+        return Catalog(by_appid.values(), generation, self.data_generation)
+
+
+    def __len__(self):
+        return len(self.items)
+
+
+
+_lock = threading.Lock()
+_current = None
+_generation = 0
+
+
+def current_catalog():
+    '''
+    Return the currently published Catalog or None if nothing was loaded yet.
+    '''
+    return _current
+
+
+def publish_catalog(items, merge: bool = False, data_generation: int = 0):
+    '''
+    Atomically swap the process-wide snapshot.
+
+    Parameters:
+        items (list): Items to publish.
+        merge (bool): If True, the items are merged into the current snapshot instead of replacing it.
+        data_generation (int): Persisted catalog generation the items were read at (ignored when merging).
+
+    Returns:
+        Catalog: The newly published snapshot.
+    '''
+    global _current, _generation
+
+    with _lock:
+        _generation += 1
+        if merge and _current is not None:
+            snapshot = _current.merged(items, _generation)
+        else:
+            snapshot = Catalog(items, _generation, data_generation)
+        _current = snapshot
+    return snapshot
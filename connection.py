@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+load_dotenv()
+
+
+# Applied to every new connection
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',        # readers never wait on the writer (and the other way around)
+    'PRAGMA synchronous = NORMAL',      # safe with WAL, far fewer fsyncs
+    'PRAGMA cache_size = -65536',       # 64 MiB page cache
+    'PRAGMA mmap_size = 268435456',     # 256 MiB memory-mapped reads
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA busy_timeout = 5000',       # writers wait for each other instead of failing right away
+)
+
+
+class ConnectionManager:
+    '''
+    Thread-local, tuned SQLite connections to one database file.
+
+    Every thread gets its own long-lived connection (with its own prepared statement cache), opened on
+    first use with PRAGMAS applied. The file defaults to the DB_PATH environment variable or 'localdb.db'.
+    '''
+
+    def __init__(self, path: str = None, cached_statements: int = 256):
+        self.path = path or os.getenv('DB_PATH', 'localdb.db')
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+
+    def configure(self, path: str):
+        '''
+        Point the manager at another database file; open connections are closed.
+        '''
+        self.close_all()
+        self.path = path
+
+
+    def connection(self):
+        '''
+        Return the calling thread's connection, opening it if needed.
+
+        Rows behave like dictionaries (sqlite3.Row), e.g. row['column_name'].
+        '''
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'path', None) == self.path:
+            return conn
+
+        conn = sqlite3.connect(self.path, cached_statements=self.cached_statements, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+
+        self._local.conn = conn
+        self._local.path = self.path
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+
+    @contextmanager
+    def transaction(self):
+        '''
+        Write transaction on the thread's connection: BEGIN IMMEDIATE, commit on success, rollback on error.
+        '''
+        conn = self.connection()
+        if conn.in_transaction:
+            conn.rollback() # never inherit a half-finished transaction
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+    def reset_after_fork(self):
+        '''
+        Forget the connections inherited from the parent process (a SQLite handle must not be used or closed
+        across fork), the child opens its own on first use.
+        '''
+        self._lock = threading.Lock()
+        self._connections = []
+        self._local = threading.local()
+
+
+    def close_all(self):
+        '''
+        Close every connection opened by this manager (e.g. on shutdown or before replacing the file).
+        '''
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass
+            self._connections = []
+        self._local = threading.local()
+
+
+
+# Shared by every Database instance in the process
+connections = ConnectionManager()
+
+# Worker processes (e.g. the offline recommendation runner) start without the parent's connections
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=connections.reset_after_fork)
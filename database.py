@@ -1,9 +1,28 @@
-import os
 import time
+import asyncio
 import datetime
-import sqlite3
 from datetime import timedelta
-from scraper import SteamDB, SteamAPI
+from scraper import SteamAPI, AsyncSteamAPI, ScrapePlanner
+from catalog import current_catalog, publish_catalog
+from ratelimit import rate_limiter, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from httpcache import response_cache
+from connection import connections
+from migrations import migrate
+
+
+SQL_CHUNK_SIZE = 900    # stay below SQLite's default limit of 999 bound parameters per query
+
+# Columns update() compares to decide whether a scraped item has to be written at all
+FINGERPRINT_COLUMNS = (
+    'name', 'discount', 'price', 'rating', 'release', 'follows',
+    'is_trending', 'is_topselling', 'is_toprated', 'is_mostwishlisted',
+)
+RANK_DEFAULTS = {'is_trending': 0, 'is_topselling': 0, 'is_toprated': 0, 'is_mostwishlisted': 0}
+
+# bootstrap_queue.status
+BOOTSTRAP_PENDING = 0
+BOOTSTRAP_DONE = 1
+BOOTSTRAP_FAILED = 2
 
 
 class Database:
@@ -19,130 +38,57 @@ class Database:
     @staticmethod
     def db_connect():
         """
-        Establish a connection to the local 'db.db' SQLite database.
+        Return the calling thread's connection to the local SQLite database (see connection.ConnectionManager).
 
-        Sets the row factory to sqlite3.Row to enable dictionary-style access to query results,
-        allowing you to access columns by name (e.g., row['column_name']).
+        The connection is long-lived and tuned (WAL, pragmas, statement cache), so callers must not close it.
+        Rows are sqlite3.Row, allowing you to access columns by name (e.g., row['column_name']).
 
         :return: SQLite3 connection object
         """
-        conn = sqlite3.connect('localdb.db')
-        conn.row_factory = sqlite3.Row  # Allows rows to behave like dictionaries
-        return conn
+        return connections.connection()
 
 
     @staticmethod
     def create_database():
         '''
-        Create localdb.db
-        '''
-
-        if os.path.exists('localdb.db'):
-            return
-        
-        conn = sqlite3.connect('localdb.db')
-        conn.execute("PRAGMA foreign_keys = ON;") # foreign key support
-        cursor = conn.cursor()
-
-
-        # Main Table for Items
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS items (
-                id INTEGER PRIMARY KEY,
-                appid INTEGER UNIQUE,
-                name TEXT,
-                discount INTEGER,
-                price INTEGER,    
-                rating INTEGER,
-                release INTEGER,
-                follows INTEGER,
-                is_trending INTEGER,
-                is_topselling INTEGER,
-                is_toprated INTEGER,
-                is_mostwishlisted INTEGER,
-                has_tags INTEGER,
-                has_genres INTEGER,
-                requested_details INTEGER,
-                last_updated TEXT DEFAULT (datetime('now'))
-            )
-        ''')
+        Create the local database (DB_PATH, default localdb.db) or upgrade an existing one to the latest schema.
 
-        # Table for SteamDB Tags and their SteamDB specific IDs
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS steamdb_tags (
-                id INTEGER PRIMARY KEY,
-                tag_id INTEGER UNIQUE,
-                tag TEXT,
-                label_count INTEGER
-            )
-        ''')
-
-        # Join Table for Genres
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS join_genres (
-                items_appid INTEGER,
-                genre_id INTEGER,
-                PRIMARY KEY (items_appid, genre_id),
-                FOREIGN KEY (items_appid) REFERENCES items(appid) ON DELETE CASCADE,
-                FOREIGN KEY (genre_id) REFERENCES genres(id) ON DELETE CASCADE
-            )
-        ''')
+        The schema lives in migrations.py and is versioned with PRAGMA user_version, so this is cheap to call
+        on every start.
 
-        # Table for Genres
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS genres (
-                id INTEGER PRIMARY KEY,
-                genre TEXT UNIQUE
-            )
-        ''')
-
-        # Join Table for User Categories
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS join_tags (
-                items_appid INTEGER,
-                tag_id INTEGER,
-                PRIMARY KEY (items_appid, tag_id),
-                FOREIGN KEY (items_appid) REFERENCES items(appid) ON DELETE CASCADE,
-                FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
-            )
-        ''')
+        Returns:
+            int: The schema version.
+        '''
+        return migrate(connections.connection())
 
-        # Table for User Tags
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tags (
-                id INTEGER PRIMARY KEY,
-                tag TEXT UNIQUE
-            )
-        ''')
 
-        # Trigger for setting current date on update in last_updated column
-        cursor.execute('''
-            CREATE TRIGGER IF NOT EXISTS update_items_last_updated
-            AFTER UPDATE ON items
-            FOR EACH ROW
-            BEGIN
-                UPDATE items SET last_updated = datetime('now') WHERE id = OLD.id;
-            END;
-        ''')
+    @staticmethod
+    def _resolve_ids(cursor, table: str, column: str, names: set) -> dict:
+        '''
+        Insert any missing names into a lookup table (genres/tags) and return name -> id for all of them.
+        '''
+        names = list(names)
+        cursor.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", [(name,) for name in names])
 
-        # Trigger for setting current date on insert in last_updated column
-        cursor.execute('''
-            CREATE TRIGGER IF NOT EXISTS insert_items_last_updated
-            AFTER INSERT ON items
-            FOR EACH ROW
-            BEGIN
-                UPDATE items SET last_updated = datetime('now') WHERE id = NEW.id;
-            END;
-        ''')
+        ids = {}
+        for i in range(0, len(names), SQL_CHUNK_SIZE):
+            chunk = names[i:i + SQL_CHUNK_SIZE]
+            query = f"SELECT {column}, id FROM {table} WHERE {column} IN ({','.join('?' * len(chunk))})"
+            ids.update(cursor.execute(query, chunk).fetchall())
+        return ids
 
 
     def insert_all(self, items):
         '''
         Inserts or updates items in the database.
 
-        Loops through each item in the provided dictionary. For each item:
-        - If the item is not in the database, it inserts it as a new record.
-        - If the item already exists (matched by appid), it updates the existing record.
+        Writes the whole batch in one transaction with a few set-based statements:
+        - items are upserted with executemany (INSERT ... ON CONFLICT(appid) DO UPDATE), matched by appid;
+        - genre and tag ids for the whole batch are resolved in memory, then the join rows are written with executemany.
+
+        requested_details stays 1 once the details were requested, even if the new value is 0.
+        has_genres/has_tags are set to 1 for items that come with genres/tags and are never cleared here.
+        last_updated is set by the statement itself (no per-row triggers).
 
         Parameters:
             items (list): A list of dictionaries where each dictionary contains item details (e.g. appid, name, price, tags, etc.).
@@ -150,158 +96,107 @@ class Database:
             None
         '''
 
-        conn = self.db_connect()
-        cursor = conn.cursor()
-
-        cursor.execute("BEGIN TRANSACTION")
-        existing_appids = {row[0] for row in cursor.execute("SELECT appid FROM items").fetchall()}
-        
-        for item in items:
-            appid = item.get('appid')
-
-            requested_details = cursor.execute('''SELECT requested_details FROM items WHERE appid = ?''', (appid,)).fetchone() # Value to check if the details were already requested thru SteamSpy API
-            # Determine the new value for requested_details based on the current value
-            new_requested_details = item.get('requested_details', 0)
-
-            # Only update requested_details if the current value is not 1 and the new value is 0
-            if requested_details and requested_details[0] == 1 and new_requested_details == 0:
-                new_requested_details = requested_details[0]  # Keep the value as 1
-
-            if appid in existing_appids:
-                # Update
-                cursor.execute('''
-                    UPDATE items SET
-                        name=?,
-                        discount=?,
-                        price=?,
-                        rating=?,
-                        release=?,
-                        follows=?,
-                        is_trending=?,
-                        is_topselling=?,
-                        is_toprated=?,
-                        is_mostwishlisted=?,
-                        requested_details=?       
-                    WHERE appid=?
-                ''', (
-                    item.get('name'),
-                    item.get('discount'),
-                    item.get('price'),
-                    item.get('rating'),
-                    item.get('release'),
-                    item.get('follows'),
-                    item.get('is_trending', 0),
-                    item.get('is_topselling', 0),
-                    item.get('is_toprated', 0),
-                    item.get('is_mostwishlisted', 0),
-                    new_requested_details,
-                    item.get('appid')
-                ))
-            else:
-                # Insert
-                cursor.execute('''
-                    INSERT INTO items (
-                        appid,
-                        name,
-                        discount,
-                        price,
-                        rating,
-                        release,
-                        follows,
-                        is_trending,
-                        is_topselling,
-                        is_toprated,
-                        is_mostwishlisted,
-                        requested_details
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    item.get('appid'),
-                    item.get('name'),
-                    item.get('discount'),
-                    item.get('price'),
-                    item.get('rating'),
-                    item.get('release'),
-                    item.get('follows'),
-                    item.get('is_trending', 0),
-                    item.get('is_topselling', 0),
-                    item.get('is_toprated', 0),
-                    item.get('is_mostwishlisted', 0),
-                    new_requested_details
-                ))
-                existing_appids.add(appid) # Add tag immediately so future iterations catch it
-            
-
-            if not item.get('genres') and not item.get('tags'):
-                continue
-
-
-            has_genres = False
-            for genre in item.get('genres') or []:
-                cursor.execute('''INSERT OR IGNORE INTO genres (genre) VALUES (?)''', (genre,))
-
-                result = cursor.execute('''SELECT id FROM genres WHERE genre = ?''', (genre,)).fetchone()
-                if result:
-                    has_genres = True
-                    cursor.execute('''INSERT OR IGNORE INTO join_genres (items_appid, genre_id) VALUES (?, ?)''', (appid, result[0]))
-            if has_genres:
-                cursor.execute('''UPDATE items SET has_genres = ? WHERE appid = ?''', (1, appid))
-
-            has_tags = False
-            for tag in item.get('tags') or []:
-                cursor.execute('''INSERT OR IGNORE INTO tags (tag) VALUES (?)''', (tag,))
-
-                result = cursor.execute('''SELECT id FROM tags WHERE tag = ?''', (tag,)).fetchone()
-                if result:
-                    cursor.execute('''INSERT OR IGNORE INTO join_tags (items_appid, tag_id) VALUES (?, ?)''', (appid, result[0]))
-                    has_tags = True
-            if has_tags:
-                cursor.execute('''UPDATE items SET has_tags = ? WHERE appid = ?''', (1, appid))
-
-        conn.commit()
-        conn.close()
+        items = [item for item in items if item]
+
+        with connections.transaction() as conn:
+            self._insert_all(conn.cursor(), items)
+
+
+    def _insert_all(self, cursor, items):
+        cursor.executemany('''
+            INSERT INTO items (
+                appid,
+                name,
+                discount,
+                price,
+                rating,
+                release,
+                follows,
+                is_trending,
+                is_topselling,
+                is_toprated,
+                is_mostwishlisted,
+                has_genres,
+                has_tags,
+                requested_details,
+                last_updated
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+            ON CONFLICT(appid) DO UPDATE SET
+                name=excluded.name,
+                discount=excluded.discount,
+                price=excluded.price,
+                rating=excluded.rating,
+                release=excluded.release,
+                follows=excluded.follows,
+                is_trending=excluded.is_trending,
+                is_topselling=excluded.is_topselling,
+                is_toprated=excluded.is_toprated,
+                is_mostwishlisted=excluded.is_mostwishlisted,
+                has_genres=COALESCE(excluded.has_genres, items.has_genres),
+                has_tags=COALESCE(excluded.has_tags, items.has_tags),
+                requested_details=CASE
+                    WHEN items.requested_details = 1 AND excluded.requested_details = 0 THEN 1
+                    ELSE excluded.requested_details
+                END,
+                last_updated=excluded.last_updated
+        ''', [(
+            item.get('appid'),
+            item.get('name'),
+            item.get('discount'),
+            item.get('price'),
+            item.get('rating'),
+            item.get('release'),
+            item.get('follows'),
+            item.get('is_trending', 0),
+            item.get('is_topselling', 0),
+            item.get('is_toprated', 0),
+            item.get('is_mostwishlisted', 0),
+            1 if item.get('genres') else None,
+            1 if item.get('tags') else None,
+            item.get('requested_details', 0),
+        ) for item in items])
+
+        # Resolve genre/tag ids for the whole batch at once
+        genre_ids = self._resolve_ids(cursor, 'genres', 'genre', {genre for item in items for genre in item.get('genres') or []})
+        tag_ids = self._resolve_ids(cursor, 'tags', 'tag', {tag for item in items for tag in item.get('tags') or []})
+
+        cursor.executemany('''INSERT OR IGNORE INTO join_genres (items_appid, genre_id) VALUES (?, ?)''', [
+            (item.get('appid'), genre_ids[genre]) for item in items for genre in item.get('genres') or []
+        ])
+        cursor.executemany('''INSERT OR IGNORE INTO join_tags (items_appid, tag_id) VALUES (?, ?)''', [
+            (item.get('appid'), tag_ids[tag]) for item in items for tag in item.get('tags') or []
+        ])
 
 
     def insert_steamdbtags(self, tags):
         '''
         Inserts or updates a tag in the database.
-        If a tag with the same tag_id exists, updates the label_count and tag name.
-        '''
+        If a tag with the same tag_id exists, updates the label_count and tag name (only if one of them changed).
 
-        conn = self.db_connect()
-        cursor = conn.cursor()
+        Returns:
+            int: Number of rows inserted or updated.
+        '''
 
-        cursor.execute("BEGIN TRANSACTION")
-        existing_tagids = {row[0] for row in cursor.execute("SELECT tag_id FROM steamdb_tags").fetchall()}
-
-        for tag in tags:
-            tagid = tag.get('id')
-            if tagid in existing_tagids:
-                cursor.execute('''
-                    UPDATE steamdb_tags SET
-                        tag=?,
-                        label_count=?
-                    WHERE tag_id=?
-                ''', (
-                    tag.get('tag'),
-                    tag.get('label_count'),
-                    tag.get('id')
-                ))
-            else:
-                cursor.execute('''
-                    INSERT INTO steamdb_tags (
-                        tag_id,
-                        tag,
-                        label_count
-                    )
-                    VALUES (?, ?, ?)
-                ''', (
-                    tag.get('id'),
-                    tag.get('tag'),
-                    tag.get('label_count')
-                ))
-                existing_tagids.add(tagid) # Add tag immediately so future iterations catch it
-        conn.commit()
-        conn.close()
+        with connections.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT INTO steamdb_tags (
+                    tag_id,
+                    tag,
+                    label_count
+                )
+                VALUES (?, ?, ?)
+                ON CONFLICT(tag_id) DO UPDATE SET
+                    tag=excluded.tag,
+                    label_count=excluded.label_count
+                WHERE steamdb_tags.tag IS NOT excluded.tag
+                   OR steamdb_tags.label_count IS NOT excluded.label_count
+            ''', [(
+                tag.get('id'),
+                tag.get('tag'),
+                tag.get('label_count')
+            ) for tag in tags])
+            return conn.total_changes - before
 
 
     @staticmethod
@@ -341,11 +236,68 @@ class Database:
         return genres, tags
 
 
+    @staticmethod
+    def get_categories_bulk(cursor, appids: list = None):
+        '''
+        Retrieve the genres and tags for many items at once.
+
+        Runs one query for genres and one for tags (per chunk of appids) instead of two queries per item.
+        Rows are ordered the same way as in get_categories(), so each list matches its per-item result.
+
+        Parameters:
+            cursor (sqlite3.Cursor): Active database cursor for executing queries.
+            appids (list): Optional list of app IDs. If None, fetches categories for every item.
+
+        Returns:
+            tuple: A tuple containing two dictionaries:
+                - genres (dict[int, list[str]]): appid -> genre names linked to the item.
+                - tags (dict[int, list[str]]): appid -> tag names linked to the item.
+        '''
+
+        genres_sql = '''
+            SELECT mg.items_appid, g.genre
+            FROM join_genres mg
+            JOIN genres g ON mg.genre_id = g.id
+            {where}
+            ORDER BY mg.items_appid, mg.genre_id
+        '''
+        tags_sql = '''
+            SELECT mg.items_appid, g.tag
+            FROM join_tags mg
+            JOIN tags g ON mg.tag_id = g.id
+            {where}
+            ORDER BY mg.items_appid, mg.tag_id
+        '''
+
+        if appids is None:
+            chunks = [None]
+        else:
+            unique_ids = list(dict.fromkeys(appids))
+            chunks = [unique_ids[i:i + SQL_CHUNK_SIZE] for i in range(0, len(unique_ids), SQL_CHUNK_SIZE)]
+
+        genres, tags = {}, {}
+        for chunk in chunks:
+            if chunk is None:
+                where, params = '', ()
+            else:
+                where, params = f"WHERE mg.items_appid IN ({','.join('?' * len(chunk))})", chunk
+
+            for appid, genre in cursor.execute(genres_sql.format(where=where), params):
+                genres.setdefault(appid, []).append(genre)
+            for appid, tag in cursor.execute(tags_sql.format(where=where), params):
+                tags.setdefault(appid, []).append(tag)
+
+        return genres, tags
+
+
     @classmethod
     def get_items(cls, ids: list = None):
         '''
         Retrieve items from the database.
 
+        Loads the item rows, genres and tags with a fixed number of set-based queries
+        (chunked for large id lists) and groups them in Python.
+
         Parameters:
             ids (list): Optional list of app IDs to filter results. If None, fetches all.
         Returns:
@@ -354,47 +306,95 @@ class Database:
 
         conn = cls.db_connect()
         cursor = conn.cursor()
+        # One read transaction, so items, genres and tags come from the same WAL snapshot
+        began = not conn.in_transaction
+        if began:
+            cursor.execute("BEGIN")
+        try:
+            if not ids:
+                rows = cursor.execute("SELECT * FROM items").fetchall()
+                genres, tags = cls.get_categories_bulk(cursor)
+            else:
+                unique_ids = list(dict.fromkeys(ids))
+                found = {}
+                for i in range(0, len(unique_ids), SQL_CHUNK_SIZE):
+                    chunk = unique_ids[i:i + SQL_CHUNK_SIZE]
+                    query = f"SELECT * FROM items WHERE appid IN ({','.join('?' * len(chunk))})"
+                    for row in cursor.execute(query, chunk):
+                        found[row['appid']] = row
+
+                # Keep the order (and repeats) of the requested ids, skipping unknown ones
+                rows = [found[id_] for id_ in ids if id_ in found]
+                genres, tags = cls.get_categories_bulk(cursor, list(found))
+        finally:
+            cursor.close()
+            if began:
+                conn.commit()
 
         items = []
-        if not ids:
-            rows = cursor.execute("SELECT * FROM items").fetchall()
-            for row in rows:
-                row_appid = row['appid']
-                if row is None:
-                    continue
-
-                genres, tags = cls.get_categories(cursor, row_appid)
-                row = dict(row)
-                row.update({
-                    'genres': genres,
-                    'tags': tags
-                })
-
-                item = cls(**row)
-                items.append(item)
+        for row in rows:
+            row_appid = row['appid']
+            row = dict(row)
+            row.update({
+                'genres': list(genres.get(row_appid, [])),
+                'tags': list(tags.get(row_appid, []))
+            })
+
+            item = cls(**row)
+            items.append(item)
 
-        else:
-            for id_ in ids:
-                row = cursor.execute("SELECT * FROM items WHERE appid = ?", (id_,)).fetchone()
-                if row is None:
-                    continue
-
-                row_appid = row['appid']
-
-                genres, tags = cls.get_categories(cursor, row_appid)
-                row = dict(row)
-                row.update({
-                    'genres': genres,
-                    'tags': tags
-                })
-                
-                item = cls(**row)
-                items.append(item)
-                
-        conn.close()  
         return items
 
 
+    @classmethod
+    def load_catalog(cls):
+        '''
+        Load the whole items table and publish it as the new process-wide catalog snapshot.
+
+        Returns:
+            Catalog: The published snapshot.
+        '''
+        cls.create_database() # every entry point (bot, scripts) loads the catalog first, make sure the schema is current
+        generation = cls.get_catalog_generation() # read first, a concurrent write can only make the snapshot newer
+        return publish_catalog(cls.get_items(), data_generation=generation)
+
+
+    @staticmethod
+    def get_catalog_generation() -> int:
+        '''
+        Persisted catalog generation (meta table), bumped by every write that can change recommendations.
+        '''
+        row = connections.connection().execute("SELECT value FROM meta WHERE key = 'catalog_generation'").fetchone()
+        return row[0] if row else 0
+
+
+    @staticmethod
+    def bump_catalog_generation(cursor) -> int:
+        '''
+        Increase the persisted catalog generation inside the caller's transaction. Cached recommendations
+        of older generations stop matching (their rows are kept to know the active users, see
+        RecommendationCache.active_steamids()), entries unused for a month are deleted.
+
+        Returns:
+            int: The new generation.
+        '''
+        cursor.execute("UPDATE meta SET value = value + 1 WHERE key = 'catalog_generation'")
+        generation = cursor.execute("SELECT value FROM meta WHERE key = 'catalog_generation'").fetchone()[0]
+        cursor.execute('DELETE FROM recommendations WHERE last_used < ?', (time.time() - 30 * 24 * 60 * 60,))
+        return generation
+
+
+    @classmethod
+    def get_catalog(cls):
+        '''
+        Return the current catalog snapshot, loading it from the database on first use.
+
+        Returns:
+            Catalog: Shared read-only snapshot of all items, with its generation counter.
+        '''
+        return current_catalog() or cls.load_catalog()
+
+
     def get_appids(self):
         '''
         Retrieve app IDs and their corresponding 'has_tags' values from the 'items' table.
@@ -405,167 +405,468 @@ class Database:
                 - 'has_tags' (int)
         '''
         try:
-            with self.db_connect() as conn:
-                cursor = conn.cursor()
-                rows = cursor.execute("SELECT appid, has_tags, has_genres, requested_details, last_updated FROM items").fetchall()
-                return [{'appid': row[0], 'has_tags': row[1], 'has_genres': row[2], 'requested_details': row[3], 'last_updated': row[4]} for row in rows]
+            rows = self.db_connect().execute("SELECT appid, has_tags, has_genres, requested_details, last_updated FROM items").fetchall()
+            return [{'appid': row[0], 'has_tags': row[1], 'has_genres': row[2], 'requested_details': row[3], 'last_updated': row[4]} for row in rows]
         except Exception as e:
             print(f"Error fetching appids: {e}")
             return []
 
 
 
-    def check_and_insert_missing(self, ids: list) -> None:
+    def existing_appids(self, ids: list) -> set:
+        '''
+        The subset of ids that are in the items table.
+        '''
+        conn = self.db_connect()
+        found = set()
+        for i in range(0, len(ids), SQL_CHUNK_SIZE):
+            chunk = ids[i:i + SQL_CHUNK_SIZE]
+            rows = conn.execute(f"SELECT appid FROM items WHERE appid IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+            found.update(row[0] for row in rows)
+        return found
+
+
+    def check_and_insert_missing(self, ids: list, priority: int = PRIORITY_INTERACTIVE) -> None:
         '''
         Check if app ids are already in Database, if not, request (via SteamSpy API) and insert to db id's categories and genres.
 
         Parameters:
             ids (list): List of IDs
+            priority (int): Rate limiter lane for the SteamSpy requests (PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND)
         '''
 
-        apps = self.get_appids()
-        db_ids = []
-        for id in apps:
-            db_ids.append(id.get('appid'))
+        # Each appid once (several libraries share games), looked up by primary key instead of loading the table
+        ids = list(dict.fromkeys(id_ for id_ in ids if id_ is not None))
+        db_ids = self.existing_appids(ids)
 
-        not_found_ids = []
-        for id_ in ids:
-            if id_ not in db_ids:
-                not_found_ids.append(id_)
+        not_found_ids = [id_ for id_ in ids if id_ not in db_ids]
         
         new_items = []
         if not_found_ids:
             print(f'Not found in localdb: {len(not_found_ids)} App IDs')
             # print(", ".join(str(x) for x in not_found_ids))
+            steamapi = SteamAPI(priority) # one client, so its connection pool is reused for every appid
             for i, id_ in enumerate(not_found_ids):
                 print(f'({i+1}/{len(not_found_ids)})', end=' ')
-                data = SteamAPI().get_app_details(id_)
+                data = steamapi.get_app_details(id_)
                 new_items.append(data)
             
         self.insert_all(new_items)
 
+        # Add the new items to the shared snapshot (if one is loaded) without reloading the whole table
+        new_appids = [item.get('appid') for item in new_items if item.get('appid')]
+        if new_appids and current_catalog() is not None:
+            publish_catalog(self.get_items(new_appids), merge=True)
+
+
 
+    # SteamDB scrape jobs of update(): (page, feature, tags, value), in merge order.
+    # Co-op (9) and Multi-Player (1) lists add apps to the DB; their filtered positions are not stored.
+    UPDATE_JOBS = (
+        ('toprated', 0, None, 250),
+        ('topselling', 0, None, 250),
+        ('trending', 0, None, 250),
+        ('trending', 9, None, 250),
+        ('trending', 1, None, 250),
+        ('topselling', 9, None, 250),
+        ('topselling', 1, None, 250),
+        ('tags', 0, None, 0),
+    )
 
-    def update(self):
+
+    @staticmethod
+    def print_progress(stage: str, done: int, total: int):
         '''
-        Fetches the latest app data from SteamDB for Trending, Top Selling and Top Rated games.
+        Default progress reporter of update().
+        '''
+        print(f'  [{stage}] {done}/{total}')
 
-        Steps:
-            1. Retrieves a list of apps from SteamDB trending, topselling and toprated pages. (default top 250 apps).
-            2. Identifies and Fetches tags and genres for each new app IDs not yet stored locally. (via SteamSpy API). (1s polling limit)
-            3. Inserts or Updates App IDs into the database with SteamDB's price, rating, followers and trending position.
 
-        This method is intended to keep the local database in sync with the latest app listings from SteamDB.
+    def _scrape_lists(self, publish):
         '''
+        Scrape the SteamDB lists and user tags over a pool of browsers (blocking, runs in a worker thread).
 
-        steamdb = SteamDB()
+        Parameters:
+            publish (callable): Called with (job, data) for every job in UPDATE_JOBS order, as soon as it is downloaded.
+        '''
+        with ScrapePlanner() as planner:
+            for job, data in planner.run(self.UPDATE_JOBS):
+                publish(job, data)
+            planner.print_stats()
 
-        print(f'{datetime.datetime.now().replace(second=0, microsecond=0)} Initializing Update.')
-        print('-'*40)
-        # Get ~1000 apps from each SteamDB page (toprated, topselling, trending)
-        try:
-            print('Downloading top rated...', end=' ')
-            toprated_data = steamdb.get_toprated(0, 'Game', None, 250)
-            print('done.')
-        except Exception as e:
-            print(e)
 
-        try:
-            print('Downloading top selling...', end=' ')
-            time.sleep(2)
-            topselling_data = steamdb.get_topselling(0, 'Game', None, 250)
-            print('done.')
-        except Exception as e:
-            print(e)
+    def _complete_appids(self):
+        '''
+        App IDs whose details do not need to be requested again.
 
-        try:
-            print('Downloading trending...', end=' ')
-            time.sleep(2.6)
-            trending_data = steamdb.get_trending(0, 'Game', None, 250)
-            print('done.') 
-        except Exception as e:
-            print(e)
+        An item is complete if it 1) HAS tags AND genres AND was requested or 2) HAS AT LEAST tags OR genres,
+        was requested AND was updated within a month.
+        '''
+        one_month_ago = datetime.datetime.now() - timedelta(days=30)
 
-        try:
-            print('Downloading user tags...', end=' ')
-            time.sleep(1.2)
-            steamdb_tags = steamdb.get_tags()
-            print('done.')
-        except Exception as e:
-            print(e)
+        local_ids = set()
+        for i in self.get_appids():
+            i_has_tags = i.get('has_tags', 0)
+            i_has_genres = i.get('has_genres', 0)
+            already_requested = i.get('requested_details', 0)
+            last_updated_date = datetime.datetime.strptime(i.get('last_updated'), '%Y-%m-%d %H:%M:%S')
 
+            if ((i_has_tags and i_has_genres) and already_requested) or ((i_has_tags or i_has_genres) and already_requested and last_updated_date > one_month_ago):
+                local_ids.add(i.get('appid'))
+        return local_ids
 
-        # Filter out SteamDB duplicates based on 'appid'
-        combined_data = (toprated_data or []) + (topselling_data or []) + (trending_data or [])
-        unique_data = {}
-        for app in combined_data:
-            appid = app['appid']
-            if appid not in unique_data:
-                unique_data[appid] = app
-            else:
-                # Merge: update only missing keys
-                for key, value in app.items():
-                    if key not in unique_data[appid] or not unique_data[appid][key]:
-                        unique_data[appid][key] = value
 
-        # Convert back to a list containing unique appids
-        data = list(unique_data.values())
+    @staticmethod
+    def fingerprint(item: dict) -> tuple:
+        '''
+        Content fingerprint of a scraped item: the values update() would write (ranks default to 0 like in insert_all()).
+        '''
+        return tuple(item.get(column, RANK_DEFAULTS.get(column)) for column in FINGERPRINT_COLUMNS)
+
 
-        # Compare which appids are New
-        steamdb_ids = []
-        for item in data:
-            steamdb_ids.append(item.get('appid'))
+    @staticmethod
+    def _stage_appids(cursor, appids):
+        '''
+        Load appids into the connection's temporary update_appids table, so set-based statements can join against it.
+        '''
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS update_appids (appid INTEGER PRIMARY KEY)')
+        cursor.execute('DELETE FROM temp.update_appids')
+        cursor.executemany('INSERT OR IGNORE INTO temp.update_appids (appid) VALUES (?)', [(appid,) for appid in appids])
 
-        localdb = self.get_appids()
-        local_ids = []
 
-        # UPDATE LOGIC
-        for i in localdb:
-            i_has_tags = i.get('has_tags', 0)
-            i_has_genres = i.get('has_genres', 0)
-            already_requested = i.get('requested_details', 0)
+    def _changed_items(self, cursor, items):
+        '''
+        Scraped items that differ from the stored rows: new appids, changed fingerprints and
+        items that come with details (genres, tags, requested_details), which are always written.
+        Expects the appids to be staged in temp.update_appids.
+        '''
+        cursor.execute(f'''
+            SELECT items.appid, {', '.join(f'items.{column}' for column in FINGERPRINT_COLUMNS)}
+            FROM items
+            JOIN temp.update_appids USING (appid)
+        ''')
+        stored = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
 
-            last_updated = i.get('last_updated', datetime.datetime.now())
-            last_updated_date = datetime.datetime.strptime(last_updated, '%Y-%m-%d %H:%M:%S')
-            current_date = datetime.datetime.now()
-            # Calculate the date one month ago (approximately 30 days)
-            one_month_ago = current_date - timedelta(days=30)
-
-            # ADD TO THE "EXCLUDE" LIST, 1) IF item HAS tags AND genres AND was requested or 2) IF item HAS AT LEAST tags OR genres BUT was requested AND within a month
-            if ((i_has_tags and i_has_genres) and already_requested) or ((i_has_tags or i_has_genres) and already_requested and last_updated_date > one_month_ago): 
-                local_ids.append(i.get('appid'))
-        # UPDATE LOGIC
-        #   
-        new_ids = set(steamdb_ids) - set(local_ids)
-
-        # Check if there are New IDs
-        steamapi = SteamAPI()
-        if new_ids:
-            items_to_insert = []
-            for i, id_ in enumerate(new_ids):
-                print(f'({i+1}/{len(new_ids)})', end=' ')
-                data_details = steamapi.get_app_details(id_)
-
-                for item in data:
-                    if item.get('appid') == id_:
-                        item.update(data_details)
-                    items_to_insert.append(item)
-        else:
-            items_to_insert = data
+        return [
+            item for item in items
+            if 'genres' in item or 'tags' in item or 'requested_details' in item
+            or stored.get(item['appid']) != self.fingerprint(item)
+        ]
+
+
+    def _write_update(self, items, steamdb_tags):
+        '''
+        Write the difference between the scraped lists and the database, then publish a new catalog snapshot (blocking).
+
+        In one transaction:
+        - trending/topselling/toprated positions of items that dropped off every list are cleared with one UPDATE;
+        - only new items, items whose fingerprint changed and items with fresh details are upserted (insert_all()).
+
+        Returns:
+            tuple: (Catalog, dict of rows touched: 'cleared', 'written', 'unchanged', 'tags')
+        '''
+        with connections.transaction() as conn:
+            cursor = conn.cursor()
+            self._stage_appids(cursor, [item['appid'] for item in items])
+
+            changed = self._changed_items(cursor, items)
+
+            # Ranks are only valid while the item is on a list
+            cursor.execute('''
+                UPDATE items
+                SET is_trending = 0,
+                    is_topselling = 0,
+                    is_toprated = 0,
+                    last_updated = datetime('now')
+                WHERE (is_trending != 0 OR is_topselling != 0 OR is_toprated != 0)
+                  AND appid NOT IN (SELECT appid FROM temp.update_appids)
+            ''')
+            cleared = cursor.rowcount
+
+            self._insert_all(cursor, changed)
+            cursor.execute('DELETE FROM temp.update_appids')
+
+            # Cached recommendations of the old lists are invalid from now on
+            if cleared or changed:
+                self.bump_catalog_generation(cursor)
 
-        # Insert to DB
-        print('\nUpdating database...')
-        self.is_trending_reset() # reset trending, topselling and toprated position values before updating with new current ones from SteamDB
-        self.insert_all(items_to_insert)
         # Inserts or Updates SteamDB Tags (label counts)
-        self.insert_steamdbtags(steamdb_tags) 
-        
+        tags_touched = self.insert_steamdbtags(steamdb_tags)
+
+        touched = {
+            'cleared': cleared,
+            'written': len(changed),
+            'unchanged': len(items) - len(changed),
+            'tags': tags_touched,
+        }
+
+        # Swap in a fresh catalog snapshot for the recommendation calls (nothing to reload if no item changed)
+        catalog = current_catalog()
+        if catalog is None or cleared or changed:
+            catalog = self.load_catalog()
+        return catalog, touched
+
+
+    async def update(self, progress=None):
+        '''
+        Fetches the latest app data from SteamDB for Trending, Top Selling and Top Rated games.
+
+        Runs as an async pipeline, so the event loop (Discord bot) keeps serving commands:
+            1. Scrapes SteamDB toprated, topselling and trending pages (default top 250 apps), their co-op and
+               multiplayer variants and user tags over a pool of browsers (UPDATE_JOBS); each list is handed
+               over as soon as it is downloaded.
+            2. Diffs every list against the local DB (loaded concurrently with the first scrape).
+            3. Fetches tags and genres for new app IDs (AsyncSteamAPI, shared rate limiter) while the next lists are scraped.
+            4. Writes only what changed (per-appid fingerprints of prices, ratings, followers and positions), clears
+               positions of items that dropped off the lists, then swaps the catalog snapshot (worker thread).
+
+        Parameters:
+            progress (callable): Optional callback (stage: str, done: int, total: int); defaults to printing.
+
+        This method is intended to keep the local database in sync with the latest app listings from SteamDB.
+        '''
+        progress = progress or self.print_progress
+        loop = asyncio.get_running_loop()
+        cache_stats = response_cache.stats()
+
+        # The write relies on the latest schema (meta table for the catalog generation)
+        await loop.run_in_executor(None, self.create_database)
+
+        print(f'{datetime.datetime.now().replace(second=0, microsecond=0)} Initializing Update.')
+        print('-'*40)
+
+        # Stage 1: scrape in a thread, lists arrive through the queue
+        scraped = asyncio.Queue()
+        def publish(job, data):
+            loop.call_soon_threadsafe(scraped.put_nowait, (job, data))
+        def scrape():
+            try:
+                self._scrape_lists(publish)
+            finally:
+                loop.call_soon_threadsafe(scraped.put_nowait, None)    # end of the lists, also when the scrape failed
+        scrape_task = loop.run_in_executor(None, scrape)
+
+        # Stage 2 input: local items that already have their details
+        local_ids = await loop.run_in_executor(None, self._complete_appids)
+
+        unique_data = {}
+        steamdb_tags = []
+        new_ids = set()
+        detail_tasks = {}
+        fetched = 0
+
+        async with AsyncSteamAPI(priority=PRIORITY_BACKGROUND) as steamapi:
+
+            async def fetch_details(appid):
+                nonlocal fetched
+                details = await steamapi.get_app_details(appid)
+                fetched += 1
+                progress('details', fetched, len(new_ids))
+                return details
+
+            try:
+                while True:
+                    entry = await scraped.get()
+                    if entry is None:
+                        break
+                    job, data = entry
+                    progress(f'downloaded {job[0]} {job[1] or ""}'.strip(), len(data), len(data))
+                    if job[0] == 'tags':
+                        steamdb_tags = data
+                        continue
+
+                    # Filter out SteamDB duplicates based on 'appid'
+                    ScrapePlanner.merge_into(unique_data, job, data)
+                    for app in data:
+                        appid = app['appid']
+
+                        # Stage 3: start fetching details of new appids right away
+                        if appid not in local_ids and appid not in detail_tasks:
+                            new_ids.add(appid)
+                            detail_tasks[appid] = asyncio.create_task(fetch_details(appid))
+
+                await scrape_task   # re-raises a scrape error
+                details = await asyncio.gather(*detail_tasks.values())
+            except BaseException:
+                for task in detail_tasks.values():
+                    task.cancel()
+                raise
+
+        for appid, data_details in zip(detail_tasks, details):
+            unique_data[appid].update(data_details)
+        items_to_insert = list(unique_data.values())
+
+        # Stage 4: bulk write
+        print('Updating database...')
+        catalog, touched = await loop.run_in_executor(None, self._write_update, items_to_insert, steamdb_tags)
+        progress('written', touched['written'], len(items_to_insert))
+
         print(f'{datetime.datetime.now().replace(second=0, microsecond=0)} Update Complete.')
         print('-'*40)
         print('Info:')
         print('  New IDs:', len(new_ids))
-        print('  Updated IDs:', len(steamdb_ids)-len(new_ids))
-        print('  Updated Game-Tags:', len(steamdb_tags), end='\n\n\n')
+        print('  Updated IDs:', len(unique_data)-len(new_ids))
+        print('  Updated Game-Tags:', len(steamdb_tags))
+        print(f"  Rows touched: {touched['written']} written, {touched['cleared']} ranks cleared, "
+              f"{touched['unchanged']} unchanged skipped, {touched['tags']} tags")
+        print('  Catalog generation:', catalog.generation)
+        rate_limiter.print_stats()
+        response_cache.print_stats(since=cache_stats)
+        print(end='\n\n')
+
+    def _bootstrap_state(self, reset: bool = False):
+        '''
+        Read (or with reset, clear) the bootstrap checkpoint (blocking).
+
+        Returns:
+            tuple: (set of downloaded pages, list of pending appids in page order)
+        '''
+        with connections.transaction() as conn:
+            if reset:
+                conn.execute('DELETE FROM bootstrap_pages')
+                conn.execute('DELETE FROM bootstrap_queue')
+            pages = {row[0] for row in conn.execute('SELECT page FROM bootstrap_pages')}
+            pending = [row[0] for row in conn.execute(
+                'SELECT appid FROM bootstrap_queue WHERE status = ? ORDER BY page, rowid', (BOOTSTRAP_PENDING,)
+            )]
+        return pages, pending
+
+
+    def _bootstrap_add_page(self, page: int, apps: list):
+        '''
+        Checkpoint a downloaded SteamSpy page: queue its apps and mark the page as done (blocking).
+        Apps that are already in the items table are queued as done.
+
+        Returns:
+            list: Pending appids of the page.
+        '''
+        with connections.transaction() as conn:
+            conn.executemany('''
+                INSERT OR IGNORE INTO bootstrap_queue (appid, name, page, status)
+                VALUES (?, ?, ?, CASE WHEN EXISTS (SELECT 1 FROM items WHERE appid = ?) THEN ? ELSE ? END)
+            ''', [(app['appid'], app['name'], page, app['appid'], BOOTSTRAP_DONE, BOOTSTRAP_PENDING) for app in apps])
+            conn.execute('INSERT OR REPLACE INTO bootstrap_pages (page, apps) VALUES (?, ?)', (page, len(apps)))
+            return [row[0] for row in conn.execute(
+                'SELECT appid FROM bootstrap_queue WHERE page = ? AND status = ? ORDER BY rowid', (page, BOOTSTRAP_PENDING)
+            )]
+
+
+    def _bootstrap_checkpoint(self, results: list):
+        '''
+        Write a chunk of fetched details and mark their appids done (or failed) in the same transaction (blocking).
+
+        Parameters:
+            results (list): (appid, details) tuples, details is an empty dict if the request failed.
+        '''
+        items = [details for appid, details in results if details]
+        with connections.transaction() as conn:
+            self._insert_all(conn.cursor(), items)
+            conn.executemany('UPDATE bootstrap_queue SET status = ? WHERE appid = ?', [
+                (BOOTSTRAP_DONE if details else BOOTSTRAP_FAILED, appid) for appid, details in results
+            ])
+
+
+    @staticmethod
+    def print_throughput(done: int, total: int, started: float, loading: bool):
+        '''
+        Default progress reporter of bootstrap(): apps written, apps per second and estimated time left.
+        '''
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0
+        eta = str(timedelta(seconds=round((total - done) / rate))) if rate else '?'
+        print(f"  [bootstrap] {done}/{total}{'+' if loading else ''} apps, {rate:.2f} apps/s, ETA {eta}")
+
+
+    async def bootstrap(self, pages: int = 5, workers: int = 4, chunk_size: int = 50, reset: bool = False, progress=None):
+        '''
+        Build the local database from the most owned apps on SteamSpy (first launch), resumable.
+
+        Replaces the old init_app(), which fetched every page, then every appid one at a time, and wrote
+        everything at the end. Here:
+            1. SteamSpy 'all' pages (1,000 apps each, 60s apart) are downloaded in the background and
+               checkpointed to bootstrap_pages/bootstrap_queue as soon as they arrive.
+            2. Workers fetch the details of queued apps concurrently, so SteamSpy appdetails and the Store
+               genres fallback use their rate budgets in parallel (shared rate limiter).
+            3. Every chunk_size results are written together with their queue status in one transaction.
+        After a crash, running it again skips the downloaded pages and the apps that were already written.
+
+        Parameters:
+            pages (int): Number of SteamSpy pages to load.
+            workers (int): Concurrent detail requests.
+            chunk_size (int): Apps per checkpoint.
+            reset (bool): Forget the checkpoint and start over (items already written are skipped anyway).
+            progress (callable): Optional callback (done: int, total: int, started: float, loading: bool);
+                                 defaults to printing throughput and ETA.
+        '''
+        progress = progress or self.print_throughput
+        loop = asyncio.get_running_loop()
+        self.create_database()
+
+        done_pages, pending = await loop.run_in_executor(None, self._bootstrap_state, reset)
+        print(f'Bootstrap: {len(done_pages)}/{pages} pages downloaded, {len(pending)} apps pending.')
+
+        queue = asyncio.Queue()
+        for appid in pending:
+            queue.put_nowait(appid)
+
+        total = len(pending)
+        done = 0
+        loading = True
+        results = []
+        started = time.monotonic()
+        write_lock = asyncio.Lock()
+
+        async def checkpoint(force=False):
+            nonlocal results, done
+            async with write_lock:
+                if not results or (len(results) < chunk_size and not force):
+                    return
+                chunk, results = results, []
+                await loop.run_in_executor(None, self._bootstrap_checkpoint, chunk)
+                done += len(chunk)
+                progress(done, total, started, loading)
+
+        async with AsyncSteamAPI(priority=PRIORITY_BACKGROUND) as steamapi:
+
+            async def load_pages():
+                nonlocal total, loading
+                try:
+                    for page in range(pages):
+                        if page in done_pages:
+                            continue
+                        apps = await steamapi.get_pages_steamspy(page, page + 1)
+                        if not apps:
+                            break
+                        new_appids = await loop.run_in_executor(None, self._bootstrap_add_page, page, apps)
+                        total += len(new_appids)
+                        for appid in new_appids:
+                            queue.put_nowait(appid)
+                finally:
+                    loading = False
+                    for _ in range(workers):
+                        queue.put_nowait(None)
+
+            async def worker():
+                while True:
+                    appid = await queue.get()
+                    if appid is None:
+                        return
+                    details = await steamapi.get_app_details(appid)
+                    results.append((appid, details))
+                    await checkpoint()
+
+            await asyncio.gather(load_pages(), *(worker() for _ in range(workers)))
+            await checkpoint(force=True)
+
+        elapsed = time.monotonic() - started
+        print('-'*40)
+        print(f'Bootstrap Complete: {done} apps written in {timedelta(seconds=round(elapsed))}'
+              f" ({done / elapsed if elapsed else 0:.2f} apps/s).")
+        rate_limiter.print_stats()
+
+        if current_catalog() is not None:
+            self.load_catalog()
+
 
     def is_trending_reset(self):
         '''
@@ -575,16 +876,13 @@ class Database:
             None
         '''
 
-        conn = self.db_connect()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-                UPDATE items
-                SET is_trending = 0,
-                    is_topselling = 0,
-                    is_toprated = 0''')
-        conn.commit()
-        conn.close()
+        with connections.transaction() as conn:
+            conn.execute('''
+                    UPDATE items
+                    SET is_trending = 0,
+                        is_topselling = 0,
+                        is_toprated = 0,
+                        last_updated = datetime('now')''')
 
 
     def __str__(self):
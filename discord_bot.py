@@ -2,8 +2,11 @@
 import os
 import discord
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 from database import Database
+from connection import connections
 from discord import app_commands
 from profiler import Profiler
 from dotenv import load_dotenv
@@ -14,8 +17,28 @@ class MyClient(discord.Client):
     def __init__(self, *, intents: discord.Intents):
         super().__init__(intents=intents)
         self.tree = app_commands.CommandTree(self)
+        # Bounded pool for blocking work (Steam requests, SQLite, scoring), keeps the event loop free
+        self.executor = ThreadPoolExecutor(max_workers=int(os.getenv('BOT_WORKERS', 4)), thread_name_prefix='sara-worker')
+        # Only one database update at a time (background or manual)
+        self.update_lock = asyncio.Lock()
+
+    async def run_blocking(self, func, *args, **kwargs):
+        '''
+        Run a synchronous function in the worker pool and await its result.
+        '''
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def close(self):
+        await super().close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        connections.close_all()
 
     async def setup_hook(self):
+        # Bring the schema up to date, then load the shared catalog snapshot once, before the first command comes in
+        Database.create_database()
+        catalog = Database.load_catalog()
+        print(f"Catalog loaded: {len(catalog)} items (generation {catalog.generation}).")
         await self.tree.sync()
         print("Slash commands synced.")
 
@@ -23,12 +46,32 @@ class MyClient(discord.Client):
         print(f'Logged in as {self.user}')
         self.loop.create_task(self.background_updater())
 
+    async def run_update(self):
+        '''
+        Run the async update pipeline, commands keep being served while it runs.
+
+        Returns:
+            bool: True if the database was updated.
+        '''
+        async with self.update_lock:
+            try:
+                await Database().update()
+            except Exception as e:
+                print('Database update failed:', e)
+                return False
+
+            # Warm the recommendation cache of the most active users for the new catalog generation
+            try:
+                await self.run_blocking(Profiler().precompute, int(os.getenv('PRECOMPUTE_USERS', 20)))
+            except Exception as e:
+                print('Precomputing recommendations failed:', e)
+            return True
+
     async def background_updater(self):
-        db = Database()
-        await db.update()  # Run once at startup
+        await self.run_update()  # Run once at startup
         while not self.is_closed():
             await asyncio.sleep(24 * 60 * 60)  # Wait 24 hours
-            await db.update()
+            await self.run_update()
 
 
 def discord_run():
@@ -42,22 +85,40 @@ def discord_run():
     @sara_group.command(name="trending", description="Get trending games for your Steam ID")
     @app_commands.describe(steam_id="Your SteamID64")
     async def trending(interaction: discord.Interaction, steam_id: str):
-        msg = Profiler().recommend(steam_id)
-        await interaction.response.send_message(msg, ephemeral=True)
+        # Acknowledge within Discord's 3s window, then do the work off the event loop
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            msg = await client.run_blocking(Profiler().recommend, steam_id)
+        except Exception as e:
+            print(f'/sara trending failed for {steam_id}:', e)
+            msg = "❌ Couldn't build recommendations for this Steam ID, try again later."
+        await interaction.followup.send(msg, ephemeral=True)
 
     # Subcommand: /sara compare
-    @sara_group.command(name="compare", description="Compare two Steam accounts for co-op recommendations")
-    @app_commands.describe(steam1="First SteamID64", steam2="Second SteamID64")
-    async def compare(interaction: discord.Interaction, steam1: str, steam2: str):
-        msg = Profiler().compare(steam1, steam2)
-        await interaction.response.send_message(msg, ephemeral=True)
+    @sara_group.command(name="compare", description="Find co-op games shared by two or more Steam accounts")
+    @app_commands.describe(steam1="First SteamID64", steam2="Second SteamID64",
+                           others="More SteamID64s separated by spaces or commas, e.g. the whole voice channel")
+    async def compare(interaction: discord.Interaction, steam1: str, steam2: str, others: str = None):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        steamids = [steam1, steam2] + (others or '').replace(',', ' ').split()
+        try:
+            msg = await client.run_blocking(Profiler().compare, *steamids)
+        except Exception as e:
+            print(f'/sara compare failed for {", ".join(steamids)}:', e)
+            msg = "❌ Couldn't compare these Steam IDs, try again later."
+        await interaction.followup.send(msg, ephemeral=True)
 
     # Subcommand: /sara update
     @sara_group.command(name="update", description="Manually update the database")
     async def manual_update(interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        await Database().update()
-        await interaction.followup.send("✅ Database updated manually!", ephemeral=True)
+        if client.update_lock.locked():
+            await interaction.followup.send("⏳ An update is already running.", ephemeral=True)
+            return
+        if await client.run_update():
+            await interaction.followup.send("✅ Database updated manually!", ephemeral=True)
+        else:
+            await interaction.followup.send("❌ Database update failed, check the logs.", ephemeral=True)
 
 
     # Add the group to the bot
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from dotenv import load_dotenv
+load_dotenv()
+
+
+# Time to live (seconds) per endpoint, matched against '<host><path>' and the 'request' query parameter.
+# 0 disables caching for that endpoint.
+ENDPOINT_TTLS = {
+    'steamspy.com/api.php?request=appdetails': 7 * 24 * 60 * 60,
+    'steamspy.com/api.php?request=all': 24 * 60 * 60,
+    'store.steampowered.com/api/appdetails': 7 * 24 * 60 * 60,
+    'api.steampowered.com/ISteamApps/GetAppList/v2/': 24 * 60 * 60,
+    'api.steampowered.com/IPlayerService/GetOwnedGames/v0001/': 0,     # libraries change often, see Profiler's library cache
+}
+
+# Query parameters that are not part of the cache key (never stored on disk)
+IGNORED_PARAMS = {'key'}
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, stored_at: float, ttl: int, etag: str = None, last_modified: str = None):
+        self.body = body
+        self.stored_at = stored_at
+        self.ttl = ttl
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+    @property
+    def fresh(self):
+        return time.time() - self.stored_at < self.ttl
+
+
+    def json(self):
+        return json.loads(self.body)
+
+
+    def validators(self):
+        '''
+        Conditional request headers for revalidating a stale entry.
+        '''
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+
+class ResponseCache:
+    '''
+    Persistent SQLite cache of JSON API responses.
+
+    Entries are keyed by the normalized URL and stored zlib-compressed. Each endpoint has its own
+    time to live (ENDPOINT_TTLS); stale entries that came with an ETag or Last-Modified header are
+    revalidated with a conditional request instead of being downloaded again.
+    '''
+
+    def __init__(self, path: str = None, ttls: dict = None):
+        self.path = path or os.getenv('HTTP_CACHE_PATH', 'httpcache.db')
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self._conn = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode = WAL')     # one commit per response appends to the log
+            self._conn.execute('PRAGMA synchronous = NORMAL')   # safe with WAL, far fewer fsyncs
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    body BLOB,
+                    size INTEGER,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL
+                )
+            ''')
+            self._conn.commit()
+        return self._conn
+
+
+    @staticmethod
+    def normalize(url):
+        '''
+        Cache key of a URL: lowercase scheme and host, sorted query parameters, without the API key.
+        '''
+        parts = urlsplit(url)
+        query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+
+    def ttl_for(self, url):
+        '''
+        Time to live of the endpoint the URL belongs to (0 if it should not be cached).
+        '''
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        endpoint = f'{host}{parts.path}'
+        request = dict(parse_qsl(parts.query)).get('request')
+        if request and f'{endpoint}?request={request}' in self.ttls:
+            return self.ttls[f'{endpoint}?request={request}']
+        return self.ttls.get(endpoint, 0)
+
+
+    def get(self, url):
+        '''
+        Return the CachedResponse for the URL (fresh or stale) or None.
+        '''
+        ttl = self.ttl_for(url)
+        if not ttl:
+            return None
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT body, stored_at, etag, last_modified FROM responses WHERE url = ?', (self.normalize(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(zlib.decompress(row[0]), row[1], ttl, row[2], row[3])
+
+
+    def store(self, url, body: bytes, etag: str = None, last_modified: str = None):
+        '''
+        Store a response body (if the endpoint is cacheable).
+        '''
+        if not self.ttl_for(url):
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO responses (url, body, size, etag, last_modified, stored_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (self.normalize(url), zlib.compress(body), len(body), etag, last_modified, time.time())
+            )
+            conn.commit()
+
+
+    def touch(self, url):
+        '''
+        Mark an entry as fresh again after a 304 Not Modified response.
+        '''
+        with self._lock:
+            conn = self._connect()
+            conn.execute('UPDATE responses SET stored_at = ? WHERE url = ?', (time.time(), self.normalize(url)))
+            conn.commit()
+
+
+    def record_hit(self, cached: CachedResponse, revalidated: bool = False):
+        with self._lock:
+            if revalidated:
+                self.revalidated += 1
+            else:
+                self.hits += 1
+            self.bytes_saved += len(cached.body)
+
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+
+    def purge(self):
+        '''
+        Delete entries that are stale and can not be revalidated.
+
+        Returns:
+            int: Number of deleted entries.
+        '''
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute('SELECT url, stored_at FROM responses WHERE etag IS NULL AND last_modified IS NULL').fetchall()
+            now = time.time()
+            stale = [(url,) for url, stored_at in rows if now - stored_at >= self.ttl_for(url)]
+            conn.executemany('DELETE FROM responses WHERE url = ?', stale)
+            conn.commit()
+        return len(stale)
+
+
+    def stats(self):
+        '''
+        Returns:
+            dict: hits, revalidated (304), misses, hit_ratio and bytes_saved since the process started.
+        '''
+        with self._lock:
+            served = self.hits + self.revalidated
+            total = served + self.misses
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'hit_ratio': round(served / total, 3) if total else 0,
+                'bytes_saved': self.bytes_saved,
+            }
+
+
+    def print_stats(self, since: dict = None):
+        '''
+        Print the cache stats, optionally only the part accumulated after an earlier stats() snapshot.
+        '''
+        s = self.stats()
+        if since:
+            for key in ('hits', 'revalidated', 'misses', 'bytes_saved'):
+                s[key] -= since.get(key, 0)
+            total = s['hits'] + s['revalidated'] + s['misses']
+            s['hit_ratio'] = round((s['hits'] + s['revalidated']) / total, 3) if total else 0
+
+        print(f"Response cache: hit ratio {s['hit_ratio']:.1%} ({s['hits']} hits, {s['revalidated']} revalidated, "
+              f"{s['misses']} misses), {s['bytes_saved'] / 1024:.1f} KiB saved")
+
+
+
+# Shared by every SteamAPI / AsyncSteamAPI instance in the process
+response_cache = ResponseCache()
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+load_dotenv()
+
+
+class LibraryCache:
+    '''
+    Bounded LRU cache of owned-game lists (GetOwnedGames), keyed by SteamID, with a time to live.
+
+    Optionally persisted to a SQLite file so a restarted bot starts warm: the file is written
+    through on every put and read on a memory miss.
+    '''
+
+    def __init__(self, maxsize: int = None, ttl: float = None, path: str = None):
+        '''
+        Params:
+            maxsize (int): Maximum number of libraries kept in memory (env LIBRARY_CACHE_SIZE, default 256).
+            ttl (float): Seconds a library stays valid (env LIBRARY_CACHE_TTL, default 600).
+            path (str): Optional SQLite file for persistence (env LIBRARY_CACHE_PATH, default: memory only).
+        '''
+        self.maxsize = maxsize if maxsize is not None else int(os.getenv('LIBRARY_CACHE_SIZE', 256))
+        self.ttl = ttl if ttl is not None else float(os.getenv('LIBRARY_CACHE_TTL', 600))
+        self.path = path if path is not None else os.getenv('LIBRARY_CACHE_PATH') or None
+
+        self._entries = OrderedDict()   # steamid -> (stored_at, games)
+        self._lock = threading.Lock()
+        self._conn = None
+
+        self.hits = 0
+        self.misses = 0
+
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS libraries (
+                    steamid TEXT PRIMARY KEY,
+                    games BLOB,
+                    stored_at REAL
+                )
+            ''')
+            self._conn.commit()
+        return self._conn
+
+
+    def _load(self, key):
+        if not self.path:
+            return None
+        row = self._connect().execute('SELECT stored_at, games FROM libraries WHERE steamid = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(zlib.decompress(row[1]))
+
+
+    def _save(self, key, stored_at, games):
+        if not self.path:
+            return
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO libraries (steamid, games, stored_at) VALUES (?, ?, ?)',
+                     (key, zlib.compress(json.dumps(games).encode()), stored_at))
+        conn.commit()
+
+
+    def get(self, steamid):
+        '''
+        Return a copy of the cached library or None if it is missing or expired.
+        '''
+        key = str(steamid)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._put(key, entry)
+
+            if entry is None or time.time() - entry[0] >= self.ttl:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(game) for game in entry[1]]
+
+
+    def _put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+    def put(self, steamid, games):
+        '''
+        Cache a library (a copy is stored, so callers may modify their list).
+        '''
+        if games is None:
+            return
+        key = str(steamid)
+        entry = (time.time(), [dict(game) for game in games])
+        with self._lock:
+            self._put(key, entry)
+            self._save(key, *entry)
+
+
+    def invalidate(self, steamid=None):
+        '''
+        Drop one SteamID or (without arguments) everything.
+        '''
+        with self._lock:
+            if steamid is None:
+                self._entries.clear()
+                if self.path:
+                    self._connect().execute('DELETE FROM libraries')
+                    self._conn.commit()
+            else:
+                self._entries.pop(str(steamid), None)
+                if self.path:
+                    self._connect().execute('DELETE FROM libraries WHERE steamid = ?', (str(steamid),))
+                    self._conn.commit()
+
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else 0,
+            }
+
+
+
+# Shared by every Profiler in the process
+library_cache = LibraryCache()
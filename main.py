@@ -1,33 +1,42 @@
+import sys
+import asyncio
 from scraper import SteamDB, SteamAPI
 from database import Database
+from snapshot import export_snapshot, import_snapshot
 from discord_bot import discord_run
 
-def init_app():
+def init_app(pages: int = 5):
     '''
-    Only use for the first app launch if there is no localdb.
+    Only use for the first app launch if there is no localdb (or to resume an interrupted first launch).
 
-    It might take from 1,5hr to 2hrs to create new database with appids and their genres
+    Downloads the most owned appids from SteamSpy and their genres and tags, see Database.bootstrap().
+    Progress is checkpointed to the database, so running it again continues where it stopped.
     '''
-
-    Database().create_database()
-    data = SteamAPI().get_pages_steamspy(0, 5)
-    apps = set()
-    for id in data:
-        apps.add(id.get('appid'))
-    Database().check_and_insert_missing(apps)
+    asyncio.run(Database().bootstrap(pages))
 
 
 
 if __name__ == "__main__":
-    discord_run()
-
     # FIRST APP INIT, CREATES DB WITH 5K MOST OWNED APPIDS
     #
-    # init_app()
+    # python main.py bootstrap [pages]
+    #
+    # Only needed if there is no localdb.db (resumes if it was interrupted)
+    # Downloads the 5000 (5 pages) most owned game appids from SteamSpy and for each appid
+    # makes an additional request to fetch its details such as genres and tags
+    if len(sys.argv) > 1 and sys.argv[1] == 'bootstrap':
+        init_app(int(sys.argv[2]) if len(sys.argv) > 2 else 5)
+
+    # PREBUILT CATALOG SNAPSHOTS
     #
-    # Only use this function if there is no localdb.db
-    # This function will create new .db and download 5000 most owned game appids from SteamSpy and for each
-    # for each appid it will make an additioanl reqeust (1s polling limit per appid) to fetch appids details such as genres and tags
+    # python main.py export catalog.snap    writes items, genres, tags and SteamDB tags to a compact file
+    # python main.py import catalog.snap    merges a snapshot into localdb.db (newer rows win)
+    elif len(sys.argv) > 2 and sys.argv[1] == 'export':
+        export_snapshot(sys.argv[2])
+    elif len(sys.argv) > 2 and sys.argv[1] == 'import':
+        import_snapshot(sys.argv[2])
+    else:
+        discord_run()
 
 
     # data = SteamAPI().get_user_library(76561198155754193)
@@ -0,0 +1,179 @@
+'''
+Versioned schema migrations for the local database.
+
+The schema version is stored in PRAGMA user_version. migrate() applies every migration newer than
+that version, in order, each in its own transaction, so fresh databases and existing installs
+(including the prebuilt localdb.db) end up with the same schema.
+
+To change the schema, append a new (version, description, statements) entry to MIGRATIONS.
+Never edit a migration that was already released.
+'''
+
+
+MIGRATIONS = [
+    (1, 'baseline schema', [
+        # Main Table for Items
+        '''
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            appid INTEGER UNIQUE,
+            name TEXT,
+            discount INTEGER,
+            price INTEGER,
+            rating INTEGER,
+            release INTEGER,
+            follows INTEGER,
+            is_trending INTEGER,
+            is_topselling INTEGER,
+            is_toprated INTEGER,
+            is_mostwishlisted INTEGER,
+            has_tags INTEGER,
+            has_genres INTEGER,
+            requested_details INTEGER,
+            last_updated TEXT DEFAULT (datetime('now'))
+        )
+        ''',
+        # Table for SteamDB Tags and their SteamDB specific IDs
+        '''
+        CREATE TABLE IF NOT EXISTS steamdb_tags (
+            id INTEGER PRIMARY KEY,
+            tag_id INTEGER UNIQUE,
+            tag TEXT,
+            label_count INTEGER
+        )
+        ''',
+        # Join Table for Genres
+        '''
+        CREATE TABLE IF NOT EXISTS join_genres (
+            items_appid INTEGER,
+            genre_id INTEGER,
+            PRIMARY KEY (items_appid, genre_id),
+            FOREIGN KEY (items_appid) REFERENCES items(appid) ON DELETE CASCADE,
+            FOREIGN KEY (genre_id) REFERENCES genres(id) ON DELETE CASCADE
+        )
+        ''',
+        # Table for Genres
+        '''
+        CREATE TABLE IF NOT EXISTS genres (
+            id INTEGER PRIMARY KEY,
+            genre TEXT UNIQUE
+        )
+        ''',
+        # Join Table for User Categories
+        '''
+        CREATE TABLE IF NOT EXISTS join_tags (
+            items_appid INTEGER,
+            tag_id INTEGER,
+            PRIMARY KEY (items_appid, tag_id),
+            FOREIGN KEY (items_appid) REFERENCES items(appid) ON DELETE CASCADE,
+            FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
+        )
+        ''',
+        # Table for User Tags
+        '''
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY,
+            tag TEXT UNIQUE
+        )
+        ''',
+    ]),
+
+    (2, 'drop per-row last_updated triggers (written by the statements now)', [
+        'DROP TRIGGER IF EXISTS update_items_last_updated',
+        'DROP TRIGGER IF EXISTS insert_items_last_updated',
+    ]),
+
+    (3, 'lookup and recommendation filter indexes', [
+        # genre/tag -> appids (the primary keys only cover appid -> genre/tag)
+        'CREATE INDEX IF NOT EXISTS idx_join_genres_genre ON join_genres (genre_id, items_appid)',
+        'CREATE INDEX IF NOT EXISTS idx_join_tags_tag ON join_tags (tag_id, items_appid)',
+        # Covering indexes for the list filters (position window + release check -> appid)
+        'CREATE INDEX IF NOT EXISTS idx_items_trending ON items (is_trending, release, appid)',
+        'CREATE INDEX IF NOT EXISTS idx_items_topselling ON items (is_topselling, release, appid)',
+        'CREATE INDEX IF NOT EXISTS idx_items_toprated ON items (is_toprated, release, appid)',
+        'CREATE INDEX IF NOT EXISTS idx_items_release ON items (release)',
+        'CREATE INDEX IF NOT EXISTS idx_items_last_updated ON items (last_updated)',
+        'ANALYZE',
+    ]),
+
+    (4, 'bootstrap checkpoint tables', [
+        # SteamSpy 'all' pages that were downloaded and queued
+        '''
+        CREATE TABLE IF NOT EXISTS bootstrap_pages (
+            page INTEGER PRIMARY KEY,
+            apps INTEGER,
+            fetched_at TEXT DEFAULT (datetime('now'))
+        )
+        ''',
+        # App IDs of those pages and whether their details were written (0 pending, 1 done, 2 failed)
+        '''
+        CREATE TABLE IF NOT EXISTS bootstrap_queue (
+            appid INTEGER PRIMARY KEY,
+            name TEXT,
+            page INTEGER,
+            status INTEGER DEFAULT 0
+        )
+        ''',
+    ]),
+
+    (5, 'catalog generation and recommendation cache', [
+        # Small key/value settings, catalog_generation is bumped by every write that can change recommendations
+        '''
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER
+        )
+        ''',
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('catalog_generation', 0)",
+        # Ranked recommendations per SteamID, valid for one library hash and catalog generation
+        '''
+        CREATE TABLE IF NOT EXISTS recommendations (
+            steamid TEXT PRIMARY KEY,
+            library_hash TEXT,
+            generation INTEGER,
+            result BLOB,
+            created_at REAL,
+            last_used REAL,
+            hits INTEGER DEFAULT 0
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_recommendations_last_used ON recommendations (last_used)',
+    ]),
+]
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, migrations: list = None):
+    '''
+    Bring the database behind conn up to the latest schema version.
+
+    Parameters:
+        conn (sqlite3.Connection): Connection to migrate (not inside a transaction).
+        migrations (list): Optional list of (version, description, statements), defaults to MIGRATIONS.
+
+    Returns:
+        int: The schema version after migrating.
+    '''
+    migrations = sorted(MIGRATIONS if migrations is None else migrations, key=lambda m: m[0])
+
+    version = schema_version(conn)
+    for number, description, statements in migrations:
+        if number <= version:
+            continue
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {int(number)}')
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+        print(f'Database migrated to version {number}: {description}')
+        version = number
+    return version
@@ -1,231 +1,443 @@
 from scraper import SteamAPI
+from ratelimit import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
 from database import Database
-from collections import Counter, defaultdict
+from scoring import ScoringEngine
+from librarycache import library_cache
+from reccache import recommendation_cache
+from concurrent.futures import ThreadPoolExecutor
 
 import time
-import random
+import heapq
+
+RANKED_LIMIT = 50       # ranked recommendations kept per user (score_users() results and cache entries)
+LIBRARY_WORKERS = 8     # concurrent GetOwnedGames requests of compare() (still paced by the shared rate limiter)
+
 
 class Profiler:
     def __init__(self):
         self.current_time = int(time.time())
 
 
-    def build_profile(self, *steamids: int):
+    def get_library(self, steamid, steam_api: SteamAPI = None):
+        '''
+        Owned games of a SteamID (GetOwnedGames), served from the library cache while it is fresh.
+        '''
+        # Owned games are cached for a while, repeated commands skip the GetOwnedGames round trip
+        games = library_cache.get(steamid)
+        if games is None:
+            games = (steam_api or SteamAPI()).get_user_library(steamid)
+            library_cache.put(steamid, games)
+        return games
+
+
+    def get_libraries(self, steamids, priority: int = PRIORITY_INTERACTIVE):
         '''
+        Owned games of several SteamIDs, the ones missing from the library cache are requested concurrently.
+
+        Parameters:
+            priority (int): Rate limiter lane for the requests.
 
+        Returns:
+            dict: steamid -> games (None if the library is unavailable, e.g. a private profile), in the order of steamids.
+        '''
+        libraries = {steamid: library_cache.get(steamid) for steamid in steamids}
+        missing = [steamid for steamid, games in libraries.items() if games is None]
+
+        def fetch(steamid):
+            try:
+                games = SteamAPI(priority).get_user_library(steamid)   # one client per thread, sessions are not shared
+            except Exception as e:
+                print(f'Library of {steamid} unavailable:', e)
+                return None
+            library_cache.put(steamid, games)
+            return games
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(len(missing), LIBRARY_WORKERS)) as executor:
+                libraries.update(zip(missing, executor.map(fetch, missing)))
+        return libraries
+
+
+    def build_profile(self, *steamids: int, libraries: dict = None, priority: int = PRIORITY_INTERACTIVE):
+        '''
+        Build the play profile (recent interests, played appids) of each SteamID.
+
+        Parameters:
+            libraries (dict): Optional steamid -> owned games that were already fetched (e.g. by the offline runner),
+                              otherwise the libraries are requested (library cache first).
+            priority (int): Rate limiter lane for those requests.
         '''
         if not steamids:
             return {}
 
-        steam_api = SteamAPI()
+        steam_api = SteamAPI(priority) if libraries is None else None
         users = {}
         for steamid in steamids:
-            games = steam_api.get_user_library(steamid)
             users[steamid] = {
                 'total_playtime': 0,
                 'last2weeks_playtime': 0,
-                'games': games
+                'games': self.get_library(steamid, steam_api) if libraries is None else libraries[steamid]
             }
 
 
-        current_unix_time = self.current_time
-        max_days = 365
-
         for steamid, user_data in users.items():
+            games = user_data.get('games') or []
+            like_scores, total_playtime, last2weeks_playtime = self.like_scores(games)
+
             # Calculate User's account total_playtime and Last 2 weeks playtime (in minutes)
-            total_playtime = 0
-            last2weeks_playtime = 0
-            for game in user_data.get('games'):
-                total_playtime += game.get('playtime_forever', 0)
-                last2weeks_playtime += game.get('playtime_2weeks', 0)
             user_data['total_playtime'] = total_playtime
             user_data['last2weeks_playtime'] = last2weeks_playtime
 
-            # Calculate playtime_ratio --> playtime_share = app's playtime_forever / user's total_playtime 
-            for game in user_data.get('games'):
-                game_playtime = game.get('playtime_forever', 0)
-                try:
-                    playtime_ratio = game_playtime / total_playtime # Playtime score (normalized)
-                except ZeroDivisionError:
-                    playtime_ratio = 0
-                game['playtime_ratio'] = round(playtime_ratio, 6)
-
-            # Calculate last2weeks_playtime_ratio --> 2 WEEKS playtime_share = app's playtime_2weeks / user's last2weeks_playtime 
-            for game in user_data.get('games'):
-                game_playtime = game.get('playtime_2weeks', 0)
-                try:
-                    last2weeks_playtime_ratio = game_playtime / last2weeks_playtime # 2 wEEKS Playtime score (normalized)
-                except ZeroDivisionError:
-                    last2weeks_playtime_ratio = 0 
-                game['last2weeks_playtime_ratio'] = round(last2weeks_playtime_ratio, 6)
-
-            # 0.1 to 1 MULTIPLIER --> days since the game was last played devided by a year (365 days)
-            for game in user_data.get('games'):
-                rtime_last_played = game.get('rtime_last_played', 0)
-                if rtime_last_played == 0:
-                    score = 0.1
-                else:
-                    days_since_played = (current_unix_time - rtime_last_played) / (24 * 60 * 60)
-                    score = max(0.1, 1 - (days_since_played / max_days))
-                game['recently_played_score'] = round(score, 3)
-
-            # Calculate SCORE
-            for game in user_data.get('games', []):
-                playtime_ratio = game.get('playtime_ratio', 0)
-                last2weeks_playtime_ratio = game.get('last2weeks_playtime_ratio', 0)/10 # add VALUE to the games that were played within 2 weeks
-                last_played = game.get('recently_played_score', 0)
-                # Final score
-                game['like_score'] = round(playtime_ratio * last_played + last2weeks_playtime_ratio, 5)
-
-
-            all_games = sorted(user_data.get('games'), key=lambda app: app['like_score'], reverse=True)    # sort by like_score descneding
-            top_games = []
-
             # Append only top 15 somewhat recent games played be the user to base recommendations of off
-            if len(all_games) > 15:
-                m = 15
-            else:
-                m = len(all_games)
-
-            for game in all_games[:m]: 
-                g = {
-                    'appid': game.get('appid'),
-                    'name': game.get('name'),
-                    'like_score': game.get('like_score')
-                }     
-                top_games.append(g)
-            user_data['recent_interests'] = top_games or []
-
-            played = []
-            for game in all_games:
-                played.append(game.get('appid'))
-            user_data['played_appids'] = played or []
+            # (nlargest keeps ties in library order, like the stable descending sort it replaces)
+            top = heapq.nlargest(15, range(len(games)), key=like_scores.__getitem__)
+            user_data['recent_interests'] = [
+                {
+                    'appid': games[i].get('appid'),
+                    'name': games[i].get('name'),
+                    'like_score': like_scores[i]
+                }
+                for i in top
+            ]
+
+            # Every owned app (library order), masked out of the recommendations
+            user_data['played_appids'] = [game.get('appid') for game in games]
 
         return users
-    
 
-    def recommend(self, *users):
-        users = Profiler().build_profile(*users)
 
-        appids = []
-        for steamid, user_data in users.items():
-            for game in user_data.get('games'):
-                appids.append(game.get('appid'))
+    def like_scores(self, games: list, totals: tuple = None):
+        '''
+        like_score of every game in a library, computed over columnar playtime arrays in one pass.
+
+        like_score = playtime_ratio * recently_played_score + last2weeks_playtime_ratio / 10, where
+            playtime_ratio              app's playtime_forever / user's total playtime (rounded to 6 places)
+            last2weeks_playtime_ratio   app's playtime_2weeks / user's last 2 weeks playtime (rounded to 6 places)
+            recently_played_score       0.1 to 1 multiplier, 1 - days since last played / 365 (rounded to 3 places)
+        rounded to 5 places, the same floats the per-game loops used to produce.
+
+        Parameters:
+            totals (tuple): Optional (total_playtime, last2weeks_playtime) of the whole library, to score only some of its games.
 
-        Database().check_and_insert_missing(appids)
+        Returns:
+            tuple: (list of like scores in library order, total_playtime, last2weeks_playtime)
+        '''
+        forever = [game.get('playtime_forever', 0) for game in games]
+        two_weeks = [game.get('playtime_2weeks', 0) for game in games]
+        last_played = [game.get('rtime_last_played', 0) for game in games]
+        total_playtime, last2weeks_playtime = totals or (sum(forever), sum(two_weeks))
+
+        current_unix_time = self.current_time
+        max_days = 365
+        day = 24 * 60 * 60
+
+        like_scores = []
+        append = like_scores.append
+        for playtime, recent, rtime in zip(forever, two_weeks, last_played):
+            # Most of a big library was never (or not recently) played: those terms are exactly 0.0
+            if playtime:
+                recently_played_score = round(max(0.1, 1 - (((current_unix_time - rtime) / day) / max_days)), 3) if rtime != 0 else 0.1
+                score = round(playtime / total_playtime, 6) * recently_played_score
+            else:
+                score = 0.0
+            if recent:
+                score += round(recent / last2weeks_playtime, 6) / 10 # add VALUE to the games that were played within 2 weeks
+            append(round(score, 5))
+        return like_scores, total_playtime, last2weeks_playtime
+
+
+    def score_users(self, *steamids, libraries: dict = None, fetch_missing: bool = True, limit: int = RANKED_LIMIT,
+                    priority: int = PRIORITY_INTERACTIVE):
+        '''
+        Build the profiles of the users and score them against the catalog in one pass (no result cache).
+
+        Parameters:
+            libraries (dict): Optional prefetched libraries, see build_profile().
+            fetch_missing (bool): Request and store details of owned apps that are not in the database yet.
+            limit (int): Length of each ranking (None for all matching items).
+            priority (int): Rate limiter lane for the library and app detail requests.
+
+        Returns:
+            tuple: (Catalog used for scoring, dict steamid -> {'ranked': [[appid, score], ...] the top limit, best first,
+                    'genres': [[genre, average like_score], ...] the top genres the ranking is based on});
+                   SteamIDs without a library (private profile or request failed) are left out.
+        '''
+        users = self.build_profile(*steamids, libraries=libraries, priority=priority)
+        users = {steamid: user_data for steamid, user_data in users.items() if user_data.get('games') is not None}
 
-        # Count shared interests across users
-        interest_counter = Counter()
+        if fetch_missing:
+            appids = []
+            for steamid, user_data in users.items():
+                for game in user_data.get('games') or []:
+                    appids.append(game.get('appid'))
+
+            Database().check_and_insert_missing(appids, priority)
+
+        # One shared snapshot for every user in this call
+        catalog = Database.get_catalog()
 
         # Per-user genre like score averages
         all_user_genre_averages = {}
 
+        engine = ScoringEngine(catalog)
         for steamid, user_data in users.items():
             interests = user_data.get('recent_interests', [])
+            all_user_genre_averages[steamid] = engine.genre_averages(interests)
+
+        # Score every user against the catalog: top 5 genres as the profile vector, played appids masked, top limit kept
+        vectors = {
+            steamid: engine.profile_vector(genre_scores, top_n=5)
+            for steamid, genre_scores in all_user_genre_averages.items()
+        }
+        played = {
+            steamid: user_data.get('played_appids')
+            for steamid, user_data in users.items()
+        }
+        ranked = engine.score(vectors, played, self.current_time, limit)
+
+        results = {
+            steamid: {
+                'ranked': [[appid, score] for appid, score in ranked[steamid]],
+                'genres': [[genre, all_user_genre_averages[steamid][genre]] for genre in vectors[steamid]],
+            }
+            for steamid in all_user_genre_averages
+        }
+        return catalog, results
 
-            # Extract appids from user's recent interests
-            appids = [interest['appid'] for interest in interests if 'appid' in interest]
-            interest_counter.update(appids)
 
-            # Fetch detailed items for this user's interests
-            items = Database().get_items(appids)
+    def cached_results(self, *steamids, precompute: bool = False):
+        '''
+        Ranked recommendations per user, served from the recommendation cache when neither the user's
+        library nor the catalog generation changed; only the other users are profiled and scored.
 
-            for item in items:
-                genres = item.genres
-                tags = item.tags
-                combined = genres + tags
+        Parameters:
+            precompute (bool): Fill the cache without counting it as user activity; its requests use the
+                               background lane of the rate limiter, so user commands go first.
 
+        Returns:
+            tuple: (Catalog, dict steamid -> result of score_users(), in the order of steamids; SteamIDs whose
+                    library is unavailable are left out)
+        '''
+        catalog = Database.get_catalog()
+        priority = PRIORITY_BACKGROUND if precompute else PRIORITY_INTERACTIVE
 
-                # item.combined = list(set(combined))
-                item.combined = list(set(genres)) # TEST Only Genres, NO USER TAGS
+        libraries = self.get_libraries(steamids, priority)
+        hashes = {steamid: recommendation_cache.library_hash(games) for steamid, games in libraries.items() if games is not None}
 
+        results = {}
+        if not precompute:
+            for steamid, library_hash in hashes.items():
+                cached = recommendation_cache.get(steamid, library_hash, catalog.data_generation)
+                if cached is not None:
+                    results[steamid] = cached
 
+        missing = [steamid for steamid in hashes if steamid not in results]
+        if missing:
+            catalog, computed = self.score_users(*missing, libraries=libraries, priority=priority)
+            for steamid, result in computed.items():
+                recommendation_cache.put(steamid, hashes[steamid], catalog.data_generation, result, used=not precompute)
+            results.update(computed)
 
-                # Match like_score from user data
-                for id_ in interests:
-                    if item.appid == id_.get('appid'):
-                        item.like_score = id_.get('like_score')
-                        break  # assume one match per appid
+        return catalog, {steamid: results[steamid] for steamid in hashes}
 
-                # Build genre_scores
-                item.genre_scores = {
-                    genre: item.like_score for genre in item.combined
-                }
 
-            # Calculate average genre scores for this user
-            genre_totals = defaultdict(float)
-            genre_counts = defaultdict(int)
+    def recommend_batch(self, steamids, limit: int = 10):
+        '''
+        Recommend games for many users at once and return structured results (nothing is printed).
+
+        Cached users are served from the recommendation cache; the others are profiled together, missing app
+        details are fetched once for the union of their libraries and all of them are scored in one pass
+        against one shared catalog snapshot.
+
+        Parameters:
+            steamids (iterable): SteamIDs (duplicates are scored once).
+            limit (int): Number of recommendations per user (None for all RANKED_LIMIT kept).
+
+        Returns:
+            dict: steamid -> {
+                'steamid': steamid,
+                'recommendations': [{'appid': int, 'name': str, 'score': float}, ...] best first,
+                'genres': [(genre, average like_score), ...] the top genres the ranking is based on,
+                'catalog_generation': persisted catalog generation the ranking was computed for,
+                'unavailable': True if the library could not be fetched (private profile or request failed),
+            }, in the order of steamids.
+        '''
+        steamids = list(dict.fromkeys(steamids))
+        catalog, results = self.cached_results(*steamids)
+
+        return {steamid: self.structured(catalog, steamid, results.get(steamid), limit) for steamid in steamids}
 
-            for item in items:
-                for genre, score in item.genre_scores.items():
-                    if score is not None:
-                        genre_totals[genre] += score
-                        genre_counts[genre] += 1
 
-            genre_averages = {
-                genre: round(genre_totals[genre] / genre_counts[genre], 6)
-                for genre in genre_totals
+    @staticmethod
+    def structured(catalog, steamid, result: dict, limit: int = 10):
+        '''
+        Turn a score_users() result (None if the library is unavailable) into the structure returned by recommend_batch().
+        '''
+        if result is None:
+            return {
+                'steamid': steamid,
+                'recommendations': [],
+                'genres': [],
+                'catalog_generation': catalog.data_generation,
+                'unavailable': True,
             }
 
-            # Sort the genre averages for this user
-            sorted_averages = dict(
-                sorted(genre_averages.items(), key=lambda x: x[1], reverse=True)
-            )
+        recommendations = []
+        for appid, score in result['ranked'][:limit]:
+            item = catalog.get(appid)
+            if item is not None:
+                recommendations.append({'appid': appid, 'name': item.name, 'score': score})
+
+        return {
+            'steamid': steamid,
+            'recommendations': recommendations,
+            'genres': [tuple(genre) for genre in result['genres']],
+            'catalog_generation': catalog.data_generation,
+            'unavailable': False,
+        }
 
-            all_user_genre_averages[steamid] = sorted_averages
 
-        
-        # Print per-user genre preferences
-        for steamid, genre_scores in all_user_genre_averages.items():
-            
+    def recommend(self, *users):
+        '''
+        Text recommendations (top 10 per user) for Discord and the console, see recommend_batch().
+        '''
+        message = ''
+        for steamid, result in self.recommend_batch(users, limit=10).items():
+            if result['unavailable']:
+                message += f"\n⚠️ Library of {steamid} is unavailable (private profile?)\n"
+                print(f"\n⚠️ Library of {steamid} is unavailable (private profile?)")
+                continue
+
+            # Show top recommendations
+            message += f"""
+🎯 Recommendations for User: {steamid}
+
+"""
+            print(f"\n🎯 Recommendations for User: {steamid}")
+            for recommendation in result['recommendations']:
+                message += f"  🔹 {recommendation['name']}\n"
+                print(f"  🔹 {recommendation['name']}")
 
-            # Get user's top N genres (e.g., top 5)
-            top_genres = list(genre_scores.keys())[:5]
+        return message
 
-            # Get user's already played/interested appids
-            for id_, user_data in users.items():
-                if steamid == id_:
-                    played_appids = user_data.get('played_appids')
 
-            # Fetch all available items from the database
-            all_items = Database().get_items()  # you'll need this method or similar
+    def shared_games(self, *steamids, limit: int = 10):
+        '''
+        Co-op/multiplayer games owned by every user, ranked by their combined like_score.
+
+        Every library becomes a bitset over the catalog positions (Catalog.bitset()), the bitsets are intersected
+        with each other and with the precomputed co-op/multiplayer bitset, so the cost is linear in the library
+        sizes and independent of the number of shared games.
+
+        Parameters:
+            steamids: Two or more SteamIDs (duplicates are counted once).
+            limit (int): Number of games to return (None for all of them).
+
+        Returns:
+            dict: {
+                'steamids': SteamIDs whose library was compared,
+                'unavailable': SteamIDs whose library could not be fetched (private profile or request failed),
+                'games': [{'appid': int, 'name': str, 'score': float, 'like_scores': {steamid: float}}, ...] best first,
+                'catalog_generation': persisted catalog generation of the snapshot used,
+            }
+        '''
+        libraries = self.get_libraries(dict.fromkeys(steamids))
+        unavailable = [steamid for steamid, games in libraries.items() if not games]
+        libraries = {steamid: games for steamid, games in libraries.items() if games}
+
+        catalog = Database.get_catalog()
+        result = {'steamids': list(libraries), 'unavailable': unavailable, 'games': [], 'catalog_generation': catalog.data_generation}
+        if len(libraries) < 2:
+            return result
+
+        owned = {steamid: [game.get('appid') for game in games] for steamid, games in libraries.items()}
+
+        # Details of shared apps the catalog does not know yet (usually none once the libraries were compared before)
+        common = set.intersection(*(set(appids) for appids in owned.values()))
+        if any(appid not in catalog.position for appid in common if appid is not None):
+            Database().check_and_insert_missing(list(common))
+            catalog = Database.get_catalog()
+
+        shared = catalog.multiplayer
+        for appids in owned.values():
+            shared &= catalog.bitset(appids)
+            if not shared:
+                return result
+
+        shared_appids = [catalog.items[i].appid for i in catalog.positions(shared)]
+        shared_set = set(shared_appids)
+        user_scores = {}
+        for steamid, games in libraries.items():
+            # Only the shared games are scored, against the playtime totals of the whole library
+            totals = (sum(game.get('playtime_forever', 0) for game in games), sum(game.get('playtime_2weeks', 0) for game in games))
+            subset = [game for game in games if game.get('appid') in shared_set]
+            scores = dict(zip((game.get('appid') for game in subset), self.like_scores(subset, totals)[0]))
+            user_scores[steamid] = {appid: scores[appid] for appid in shared_appids}
+
+        combined = {appid: round(sum(scores[appid] for scores in user_scores.values()), 5) for appid in shared_appids}
+        # Ties keep the catalog order
+        if limit is None:
+            top = sorted(shared_appids, key=combined.__getitem__, reverse=True)
+        else:
+            top = heapq.nlargest(limit, shared_appids, key=combined.__getitem__)
+
+        result['games'] = [
+            {
+                'appid': appid,
+                'name': catalog.get(appid).name,
+                'score': combined[appid],
+                'like_scores': {steamid: scores[appid] for steamid, scores in user_scores.items()},
+            }
+            for appid in top
+        ]
+        return result
 
-            # Filter and score potential recommendations
-            recommendations = []
-            for item in all_items:
-                if item.appid in played_appids:
-                    continue  # skip already played
-                
-                
-                if not (1 <= item.is_trending <= 150):  # less than 1 and greater than 100
-                    continue    # skip not trending games
 
-                release_unix = item.release if item.release else 0  # Set release_unix to 0 if item.release is None
-                if not (0 < release_unix <= self.current_time): # not (Check if release time is valid (between 1970 and the current time))
-                    continue # Skip invalid items
+    def compare(self, *steamids, limit: int = 10):
+        '''
+        Text list of the co-op/multiplayer games all users own (top 10) for Discord and the console, see shared_games().
+        '''
+        result = self.shared_games(*steamids, limit=limit)
 
-                combined = set(item.genres + item.tags)
-                match_score = len(set(top_genres) & combined)
+        message = ''
+        for steamid in result['unavailable']:
+            message += f"⚠️ Library of {steamid} is unavailable (private profile?)\n"
+            print(f"⚠️ Library of {steamid} is unavailable (private profile?)")
 
-                if match_score > 0:
-                    recommendations.append((item, match_score))
+        if len(result['steamids']) < 2:
+            message += "❌ At least two public libraries are needed to compare.\n"
+            return message
 
-            # Sort recommendations by match score (descending)
-            recommendations.sort(key=lambda x: x[1], reverse=True)
+        if not result['games']:
+            message += f"\n😕 No co-op/multiplayer games shared by {', '.join(result['steamids'])}\n"
+            print(f"\n😕 No co-op/multiplayer games shared by {', '.join(result['steamids'])}")
+            return message
 
-            # random.shuffle(recommendations)
-            # Show top recommendations
-            message = f"""
-🎯 Recommendations for User: {steamid}
+        message += f"""
+🤝 Co-op games shared by {', '.join(result['steamids'])}
 
 """
-            print(f"\n🎯 Recommendations for User: {steamid}")
-            for item, score in recommendations[:10]:  # top 10 matches
-                line = f"  🔹 {item.name}\n"
-                message += line
-                print(f"  🔹 {item.name}")
+        print(f"\n🤝 Co-op games shared by {', '.join(result['steamids'])}")
+        for game in result['games']:
+            message += f"  🔹 {game['name']}\n"
+            print(f"  🔹 {game['name']}")
 
         return message
+
+
+    def precompute(self, limit: int = 20):
+        '''
+        Refresh the cached recommendations of the most recently active users (e.g. right after an update),
+        so their next request is served from the cache.
+
+        Returns:
+            int: Number of users scored.
+        '''
+        steamids = recommendation_cache.active_steamids(limit)
+        if steamids:
+            self.cached_results(*steamids, precompute=True)
+            print(f'Precomputed recommendations for {len(steamids)} users.')
+        return len(steamids)
     
 
 if __name__ == "__main__":
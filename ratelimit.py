@@ -0,0 +1,208 @@
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+
+PRIORITY_INTERACTIVE = 0    # user commands (/sara trending, compare)
+PRIORITY_BACKGROUND = 1     # update(), catalog bootstrap, enrichment
+
+
+# Bucket name -> (requests per second, burst size)
+HOST_LIMITS = {
+    'steamspy.com': (1.0, 1),               # appdetails: ~1 request per second
+    'steamspy.com/all': (1 / 60, 1),        # request=all pages: 1 request per 60 seconds
+    'api.steampowered.com': (1.5, 3),
+    'store.steampowered.com': (0.66, 3),    # ~200 requests per 5 minutes
+    'steamdb.info': (0.5, 1),               # politeness: one page load every 2 seconds across all browsers
+}
+DEFAULT_LIMIT = (1.0, 1)
+
+
+def bucket_name(url):
+    '''
+    Map a URL to the name of the token bucket it is limited by.
+    '''
+    parts = urlsplit(url)
+    host = parts.hostname or ''
+    if host.startswith('www.'):
+        host = host[4:]
+    if host == 'steamspy.com' and parse_qs(parts.query).get('request') == ['all']:
+        return 'steamspy.com/all'
+    return host
+
+
+class TokenBucket:
+    '''
+    Token bucket with a queue of waiting tickets ordered by (priority, arrival).
+
+    Not thread-safe on its own, RateLimiter holds the lock.
+    '''
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.queue = []     # heap of (priority, seq)
+
+        # Stats
+        self.granted = [0, 0]       # per priority lane
+        self.total_wait = [0.0, 0.0]
+        self.max_wait = [0.0, 0.0]
+        self.max_queue_depth = 0
+
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+    def try_take(self, ticket, now):
+        '''
+        Take a token for the ticket if it is first in line and a token is available.
+
+        Returns:
+            float: 0 if the token was taken, otherwise seconds to wait before trying again.
+        '''
+        self._refill(now)
+        if self.queue[0] == ticket and self.tokens >= 1:
+            self.tokens -= 1
+            heapq.heappop(self.queue)
+            return 0
+        return max((1 - self.tokens) / self.rate, 0.01)
+
+
+
+class RateLimiter:
+    '''
+    Process-wide scheduler of outgoing API requests.
+
+    Every host has its own token bucket (HOST_LIMITS). Callers wait in a queue per bucket where
+    PRIORITY_INTERACTIVE tickets are always served before PRIORITY_BACKGROUND ones, so user commands
+    jump ahead of background enrichment. Works for threads (acquire) and coroutines (acquire_async).
+    '''
+
+    def __init__(self, limits: dict = None, default: tuple = DEFAULT_LIMIT):
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self.default = default
+        self.buckets = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+
+    def _bucket(self, name):
+        bucket = self.buckets.get(name)
+        if bucket is None:
+            bucket = self.buckets[name] = TokenBucket(*self.limits.get(name, self.default))
+        return bucket
+
+
+    def _enqueue(self, url, priority):
+        name = bucket_name(url)
+        ticket = (priority, next(self._seq))
+        with self._lock:
+            bucket = self._bucket(name)
+            heapq.heappush(bucket.queue, ticket)
+            bucket.max_queue_depth = max(bucket.max_queue_depth, len(bucket.queue))
+        return bucket, ticket
+
+
+    def _try(self, bucket, ticket):
+        with self._lock:
+            return bucket.try_take(ticket, time.monotonic())
+
+
+    def _record(self, bucket, priority, waited):
+        with self._lock:
+            bucket.granted[priority] += 1
+            bucket.total_wait[priority] += waited
+            bucket.max_wait[priority] = max(bucket.max_wait[priority], waited)
+
+
+    def _cancel(self, bucket, ticket):
+        with self._lock:
+            if ticket in bucket.queue:
+                bucket.queue.remove(ticket)
+                heapq.heapify(bucket.queue)
+
+
+    def acquire(self, url, priority: int = PRIORITY_INTERACTIVE):
+        '''
+        Block the calling thread until a request to url is allowed.
+
+        Returns:
+            float: Seconds spent waiting.
+        '''
+        start = time.monotonic()
+        bucket, ticket = self._enqueue(url, priority)
+        try:
+            while True:
+                wait = self._try(bucket, ticket)
+                if not wait:
+                    break
+                time.sleep(wait)
+        except BaseException:
+            self._cancel(bucket, ticket)
+            raise
+
+        waited = time.monotonic() - start
+        self._record(bucket, priority, waited)
+        return waited
+
+
+    async def acquire_async(self, url, priority: int = PRIORITY_INTERACTIVE):
+        '''
+        Same as acquire(), but waits with asyncio.sleep() so the event loop keeps running.
+        '''
+        start = time.monotonic()
+        bucket, ticket = self._enqueue(url, priority)
+        try:
+            while True:
+                wait = self._try(bucket, ticket)
+                if not wait:
+                    break
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._cancel(bucket, ticket)
+            raise
+
+        waited = time.monotonic() - start
+        self._record(bucket, priority, waited)
+        return waited
+
+
+    def stats(self):
+        '''
+        Queue depth and wait-time statistics per bucket.
+
+        Returns:
+            dict: bucket name -> {'queue_depth', 'max_queue_depth', 'requests', 'avg_wait', 'max_wait'},
+                  where requests/avg_wait/max_wait are lists indexed by priority lane.
+        '''
+        with self._lock:
+            return {
+                name: {
+                    'queue_depth': len(bucket.queue),
+                    'max_queue_depth': bucket.max_queue_depth,
+                    'requests': list(bucket.granted),
+                    'avg_wait': [round(total / count, 3) if count else 0 for total, count in zip(bucket.total_wait, bucket.granted)],
+                    'max_wait': [round(w, 3) for w in bucket.max_wait],
+                }
+                for name, bucket in self.buckets.items()
+            }
+
+
+    def print_stats(self):
+        print('Rate limiter (interactive / background):')
+        for name, s in self.stats().items():
+            print(f"  {name}: requests {s['requests'][0]}/{s['requests'][1]}, "
+                  f"avg wait {s['avg_wait'][0]}s/{s['avg_wait'][1]}s, max wait {s['max_wait'][0]}s/{s['max_wait'][1]}s, "
+                  f"queue {s['queue_depth']} (max {s['max_queue_depth']})")
+
+
+
+# Shared by every SteamAPI / AsyncSteamAPI instance in the process
+rate_limiter = RateLimiter()
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from connection import connections
+from dotenv import load_dotenv
+load_dotenv()
+
+
+class RecommendationCache:
+    '''
+    Persistent cache of ranked recommendations per SteamID (recommendations table of the local database).
+
+    An entry is only served for the same library (library_hash() of the owned games and their playtimes)
+    and the same persisted catalog generation, so a refresh that changes the lists (Database.bump_catalog_generation())
+    invalidates every entry at once. Entries also expire after a time to live, because recency scores and
+    the release filter depend on the current time.
+
+    A hit is served by a plain read; its bookkeeping (last_used, hits) is kept in memory and written with
+    the next write (flush()), so a hit never waits on the updater's write lock.
+    '''
+
+    def __init__(self, ttl: float = None):
+        '''
+        Params:
+            ttl (float): Seconds an entry stays valid (env REC_CACHE_TTL, default 21600 = 6 hours).
+        '''
+        self.ttl = ttl if ttl is not None else float(os.getenv('REC_CACHE_TTL', 6 * 60 * 60))
+        self._lock = threading.Lock()
+        self._pending = {}  # steamid -> (last used, hits) not written yet
+
+        self.hits = 0
+        self.misses = 0
+
+
+    @staticmethod
+    def library_hash(games):
+        '''
+        Hash of everything build_profile() reads from a library, or None if the library is missing.
+        '''
+        if games is None:
+            return None
+        rows = sorted(
+            (game.get('appid') or 0, game.get('playtime_forever', 0), game.get('playtime_2weeks', 0), game.get('rtime_last_played', 0))
+            for game in games
+        )
+        return hashlib.blake2b(json.dumps(rows).encode(), digest_size=16).hexdigest()
+
+
+    def get(self, steamid, library_hash: str, generation: int):
+        '''
+        Return the cached result or None if there is none for this library and catalog generation.
+        '''
+        if library_hash is None:
+            return None
+        key = str(steamid)
+        now = time.time()
+        row = connections.connection().execute(
+            'SELECT library_hash, generation, result, created_at FROM recommendations WHERE steamid = ?', (key,)
+        ).fetchone()
+
+        if row is None or row[0] != library_hash or row[1] != generation or now - row[3] >= self.ttl:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            hits = self._pending.get(key, (0, 0))[1]
+            self._pending[key] = (now, hits + 1)
+        return json.loads(zlib.decompress(row[2]))
+
+
+    def put(self, steamid, library_hash: str, generation: int, result: dict, used: bool = True):
+        '''
+        Store the result (JSON serializable) for this library and catalog generation.
+
+        Params:
+            used (bool): False for precomputed results, so they do not count as activity of the SteamID.
+        '''
+        if library_hash is None:
+            return
+        now = time.time()
+        last_used = now if used else 0
+        with connections.transaction() as conn:
+            conn.execute('''
+                INSERT INTO recommendations (steamid, library_hash, generation, result, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(steamid) DO UPDATE SET
+                    library_hash=excluded.library_hash,
+                    generation=excluded.generation,
+                    result=excluded.result,
+                    created_at=excluded.created_at,
+                    last_used=MAX(COALESCE(recommendations.last_used, 0), excluded.last_used)
+            ''', (str(steamid), library_hash, generation, zlib.compress(json.dumps(result).encode()), now, last_used))
+        self.flush()
+
+
+    def flush(self):
+        '''
+        Write the pending bookkeeping of cache hits (best effort: kept for the next try if the database is busy).
+        '''
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        try:
+            with connections.transaction() as conn:
+                conn.executemany(
+                    'UPDATE recommendations SET last_used = MAX(COALESCE(last_used, 0), ?), hits = hits + ? WHERE steamid = ?',
+                    [(last_used, hits, steamid) for steamid, (last_used, hits) in pending.items()]
+                )
+        except sqlite3.OperationalError as e:
+            print('Recommendation cache: hit bookkeeping not written yet:', e)
+            with self._lock:
+                for steamid, (last_used, hits) in pending.items():
+                    newer_used, newer_hits = self._pending.get(steamid, (0, 0))
+                    self._pending[steamid] = (max(last_used, newer_used), hits + newer_hits)
+
+
+    def invalidate(self, steamid=None):
+        '''
+        Drop one SteamID or (without arguments) everything.
+        '''
+        with connections.transaction() as conn:
+            if steamid is None:
+                conn.execute('DELETE FROM recommendations')
+            else:
+                conn.execute('DELETE FROM recommendations WHERE steamid = ?', (str(steamid),))
+
+
+    def active_steamids(self, limit: int = 20):
+        '''
+        The most recently used SteamIDs, e.g. to precompute their recommendations after an update.
+        '''
+        self.flush()
+        rows = connections.connection().execute(
+            'SELECT steamid FROM recommendations ORDER BY last_used DESC LIMIT ?', (limit,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else 0,
+            }
+
+
+
+# Shared by every Profiler in the process
+recommendation_cache = RecommendationCache()
@@ -0,0 +1,181 @@
+from itertools import islice
+from collections import defaultdict
+
+
+MAX_COMBINATION_LABELS = 8     # profile vectors with more labels are scored by accumulation (2^n label combinations)
+
+
+class ScoringEngine:
+    '''
+    Sparse item x genre/tag scoring over a Catalog snapshot.
+
+    The catalog is stored as a sparse 0/1 matrix in compressed-column form: for every genre/tag (column)
+    the sorted row numbers of the items labelled with it. A user profile is a sparse weight vector over
+    the same columns, so a user's scores are the sparse product (labels) . (labels x items), produced best
+    first by matches() and cut off once the top k rows are known.
+
+    Rows follow the catalog order, which is also the tie-breaker for equal scores.
+    '''
+
+    def __init__(self, catalog, trending_only: bool = True):
+        '''
+        Params:
+            catalog (Catalog): Snapshot to score against.
+            trending_only (bool): Use only the items that pass the trending and release filters as rows.
+        '''
+        self.catalog = catalog
+        self.generation = catalog.generation
+
+        items = catalog.trending if trending_only else catalog.items
+        items = sorted(items, key=lambda item: catalog.position[item.appid])
+
+        self.row_appids = [item.appid for item in items]
+        self.row_release = [item.release or 0 for item in items]
+        row_of = {appid: row for row, appid in enumerate(self.row_appids)}
+
+        index = catalog.trending_index if trending_only else catalog.index
+        self.columns = {
+            label: sorted(row_of[appid] for appid in appids)
+            for label, appids in index.items()
+        }
+        self._column_sets = {}
+
+
+    def genre_averages(self, interests: list):
+        '''
+        Average like_score per genre over the user's recent interests, sorted descending.
+
+        Parameters:
+            interests (list): Profile entries with 'appid' and 'like_score' (Profiler.build_profile()['recent_interests']).
+
+        Returns:
+            dict[str, float]: genre -> average like_score (rounded to 6 places), best first.
+        '''
+        like_scores = {}
+        for interest in interests:
+            like_scores.setdefault(interest.get('appid'), interest.get('like_score'))
+
+        appids = [interest['appid'] for interest in interests if 'appid' in interest]
+
+        genre_totals = defaultdict(float)
+        genre_counts = defaultdict(int)
+        for item in self.catalog.get_items(appids):
+            score = like_scores.get(item.appid)
+            if score is None:
+                continue
+            for genre in list(set(item.genres)): # Only Genres, NO USER TAGS
+                genre_totals[genre] += score
+                genre_counts[genre] += 1
+
+        genre_averages = {
+            genre: round(genre_totals[genre] / genre_counts[genre], 6)
+            for genre in genre_totals
+        }
+        return dict(sorted(genre_averages.items(), key=lambda x: x[1], reverse=True))
+
+
+    @staticmethod
+    def profile_vector(genre_averages: dict, top_n: int = 5):
+        '''
+        Sparse weight vector of a user: weight 1 for each of the user's top N genres.
+        '''
+        return {genre: 1 for genre in list(genre_averages)[:top_n]}
+
+
+    def column_set(self, label):
+        '''
+        Rows of a genre/tag as a set (built on first use and kept for the other users of this engine).
+        '''
+        rows = self._column_sets.get(label)
+        if rows is None:
+            rows = self._column_sets[label] = frozenset(self.columns.get(label, ()))
+        return rows
+
+
+    def matches(self, vector: dict):
+        '''
+        Stream the rows matching a profile vector with their scores, best first (ties keep the row order).
+
+        A row's score is the total weight of the combination of the vector's labels it is labelled with, so the
+        combinations are visited from the highest total down and the rows of a score level are only looked up
+        (set intersections of the posting lists) when the consumer asks for them: taking the top k stops the
+        stream after the last level they need. Vectors with more than MAX_COMBINATION_LABELS labels are scored
+        by accumulating every posting instead.
+
+        Yields:
+            tuple: (row, score)
+        '''
+        labels = []
+        weights = []
+        for label, weight in vector.items():
+            if weight and self.columns.get(label):
+                labels.append(label)
+                weights.append(weight)
+        if not labels:
+            return
+
+        if len(labels) > MAX_COMBINATION_LABELS:
+            totals = defaultdict(float)
+            for label, weight in zip(labels, weights):
+                for row in self.columns[label]:
+                    totals[row] += weight
+            yield from sorted(totals.items(), key=lambda x: (-x[1], x[0]))
+            return
+
+        everything = range(len(labels))
+        sets = [self.column_set(label) for label in labels]
+
+        # Score level -> label combinations (bitmasks) reaching it, summed in vector order like an accumulation would
+        levels = defaultdict(list)
+        for mask in range(1, 1 << len(labels)):
+            levels[sum((weights[i] for i in everything if mask >> i & 1), 0.0)].append(mask)
+
+        for score in sorted(levels, reverse=True):
+            rows = set()
+            for mask in levels[score]:
+                inside = sorted((sets[i] for i in everything if mask >> i & 1), key=len)
+                matched = inside[0].intersection(*inside[1:])
+                if matched:
+                    # Labelled with exactly this combination
+                    rows.update(matched.difference(*(sets[i] for i in everything if not mask >> i & 1)))
+            for row in sorted(rows):
+                yield row, score
+
+
+    def allowed(self, matches, played=None, current_time: int = None):
+        '''
+        Filter stage of the pipeline: drop already played apps and apps released after current_time.
+
+        The trending window is applied by the rows themselves (trending_only).
+        '''
+        masked = set(played or ())
+        row_appids = self.row_appids
+        row_release = self.row_release
+        for row, score in matches:
+            if row_appids[row] in masked:
+                continue
+            if current_time is not None and row_release[row] > current_time:
+                continue
+            yield row, score
+
+
+    def score(self, vectors: dict, played: dict = None, current_time: int = None, limit: int = None):
+        '''
+        Score every user against the catalog: matches() -> allowed() -> first limit rows, one lazy pipeline per user.
+
+        Parameters:
+            vectors (dict): steamid -> {label: weight} profile vectors.
+            played (dict): Optional steamid -> iterable of appids to mask out (already played).
+            current_time (int): Optional unix time, items released after it are masked out.
+            limit (int): Number of results per user, None for the whole ranking.
+
+        Returns:
+            dict: steamid -> list of (appid, score) tuples, best first (ties keep the catalog order).
+        '''
+        played = played or {}
+
+        results = {}
+        for steamid, vector in vectors.items():
+            candidates = self.allowed(self.matches(vector), played.get(steamid), current_time)
+            results[steamid] = [(self.row_appids[row], score) for row, score in islice(candidates, limit)]
+        return results
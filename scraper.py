@@ -1,10 +1,15 @@
 import os
 import json
 import time
+import asyncio
+import aiohttp
 import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ratelimit import rate_limiter, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from httpcache import response_cache
 
-from bs4 import BeautifulSoup
-from bs4.element import Tag
+from html.parser import HTMLParser
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -19,13 +24,352 @@ from selenium.webdriver.common.by import By
 
 
 
-class SteamDB:
+class AppTableParser(HTMLParser):
+    '''
+    Streaming parser for SteamDB stats tables.
+
+    Only <tr class="app"> rows are looked at: the data-sort attributes of their cells are read straight
+    into typed columns and everything else in the page is skipped by the tokenizer without building a tree.
+    Produces the same dicts SteamDB.get_page() always returned.
+    '''
+
+    VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+    def __init__(self, section=None):
+        super().__init__(convert_charrefs=True)
+        self.section = section
+        self.apps = []
+
+        self._app = None
+        self._depth = 0         # element depth inside the current row (the <tr> itself is 1)
+        self._cell = -1         # index of the current direct child of the row
+        self._in_name = 0       # depth of the first <a> of the name cell, 0 when outside
+        self._name_seen = False
+        self._name = []
+
+
+    def handle_starttag(self, tag, attrs):
+        if self._app is None:
+            if tag == 'tr':
+                attrs = dict(attrs)
+                if 'app' in (attrs.get('class') or '').split():
+                    self._app = {'appid': int(attrs.get('data-appid', 0))}
+                    self._depth = 1
+                    self._cell = -1
+                    self._name_seen = False
+            return
+
+        if tag in self.VOID_TAGS:
+            if self._depth == 1:
+                self._cell += 1
+            return
+
+        self._depth += 1
+        if self._in_name:
+            self._in_name += 1
+        elif self._depth == 2:
+            self._cell += 1
+            self._read_cell(dict(attrs))
+        elif tag == 'a' and self._cell == 2 and not self._name_seen:
+            self._in_name = 1
+            self._name_seen = True
+
+
+    def handle_endtag(self, tag):
+        if self._app is None or tag in self.VOID_TAGS:
+            return
+
+        if self._in_name:
+            self._in_name -= 1
+            if not self._in_name:
+                self._app['name'] = ''.join(self._name)
+                self._name = []
+
+        self._depth -= 1
+        if self._depth == 0:
+            self.apps.append(self._app)
+            self._app = None
+
+
+    def handle_data(self, data):
+        if self._in_name:
+            data = data.strip()
+            if data:
+                self._name.append(data)
+
+
+    def _read_cell(self, attrs):
+        # Follows table like strcutre (from SteamDB), first col (0) is Nr, second col (1) is img, third col (2) is name... etc
+        app = self._app
+        i = self._cell
+        if i == 0:
+            rank = int(attrs.get('data-sort', 0))
+            app['is_trending'] = rank if self.section == 'trending' else 0
+            app['is_toprated'] = rank if self.section == 'toprated' else 0
+            app['is_topselling'] = rank if self.section == 'topselling' else 0
+            app['is_mostwishlisted'] = rank if self.section == 'mostwishlisted' else 0
+        elif i == 2:
+            app['name'] = '' # filled in from the first <a> of the cell
+        elif i == 3:
+            app['discount'] = int(attrs.get('data-sort', 0))
+        elif i == 4:
+            app['price'] = int(attrs.get('data-sort', -1)) if str(attrs.get('data-sort', -1)).isdigit() else -1
+        elif i == 5:
+            app['rating'] = round(float(attrs.get('data-sort', 0)))
+        elif i == 6:
+            app['release'] = int(attrs.get('data-sort', 0))
+        elif i == 7:
+            app['follows'] = int(attrs.get('data-sort', 0))
+
+
+
+class TagLabelParser(HTMLParser):
+    '''
+    Streaming parser for the SteamDB tags page: reads every <div class="label"> into
+    {'tag': str, 'id': int, 'label_count': int}, the same dicts SteamDB.get_tags() always returned.
+    '''
+
     def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tags = []
+
+        self._label = None      # state of the current div.label
+        self._depth = 0
+        self._a_depth = 0
+        self._span_depth = 0
+        self._count_depth = 0
+
+
+    def handle_starttag(self, tag, attrs):
+        if tag in AppTableParser.VOID_TAGS:
+            return
+
+        if self._label is None:
+            if tag == 'div' and 'label' in (dict(attrs).get('class') or '').split():
+                self._label = {'href': None, 'a_text': [], 'span_text': [], 'span_seen': False, 'count': None}
+                self._depth = 1
+            return
+
+        self._depth += 1
+        label = self._label
+        if self._a_depth:
+            self._a_depth += 1
+        if self._span_depth:
+            self._span_depth += 1
+        if self._count_depth:
+            self._count_depth += 1
+
+        if tag == 'a' and label['href'] is None and not self._a_depth:
+            label['href'] = dict(attrs).get('href', '')
+            self._a_depth = 1
+        elif tag == 'span':
+            if self._a_depth and not label['span_seen'] and not self._span_depth:
+                label['span_seen'] = True
+                self._span_depth = 1
+            if label['count'] is None and not self._count_depth and 'label-count' in (dict(attrs).get('class') or '').split():
+                label['count'] = []
+                self._count_depth = 1
+
+
+    def handle_endtag(self, tag):
+        if self._label is None or tag in AppTableParser.VOID_TAGS:
+            return
+
+        if self._a_depth:
+            self._a_depth -= 1
+        if self._span_depth:
+            self._span_depth -= 1
+        if self._count_depth:
+            self._count_depth -= 1
+
+        self._depth -= 1
+        if self._depth == 0:
+            label = self._label
+            self._label = None
+
+            tag_name = ''.join(label['a_text']).replace(''.join(label['span_text']), '').strip()
+            tag_id = label['href'].split('/')[2]  # '/tag/4166/?min_reviews=500'
+            label_count = ''.join(label['count']) if label['count'] is not None else '0'
+            self.tags.append({
+                'tag': str(tag_name),
+                'id': int(tag_id),
+                'label_count': int(label_count or 0)
+            })
+
+
+    def handle_data(self, data):
+        if self._label is None:
+            return
+        data = data.strip()
+        if not data:
+            return
+        if self._a_depth:
+            self._label['a_text'].append(data)
+        if self._span_depth:
+            self._label['span_text'].append(data)
+        if self._count_depth:
+            self._label['count'].append(data)
+
+
+
+class BrowserSession:
+    '''
+    Long-lived Firefox WebDriver shared by many page loads.
+
+    The browser is launched on first use and kept open until quit(). Before every page it is
+    health-checked and restarted if it crashed, and page loads are spaced by the shared rate limiter
+    (steamdb.info bucket). Launch and page timings are tracked separately.
+
+    Usage:
+        with BrowserSession(options, service) as browser:
+            html = browser.get_html(url)
+    '''
+
+    def __init__(self, options, service):
+        self.options = options
+        self.service = service
+        self.driver = None
+
+        self.launches = 0
+        self.restarts = 0
+        self.launch_seconds = 0.0
+        self.pages = 0
+        self.page_seconds = 0.0
+
+
+    def start(self):
+        start = time.perf_counter()
+        self.driver = webdriver.Firefox(service=self.service, options=self.options)
+        self.launches += 1
+        self.launch_seconds += time.perf_counter() - start
+        return self.driver
+
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print('Failed to quit the driver:', e)
+        self.driver = None
+
+
+    def is_alive(self):
+        '''
+        Health check: the driver answers a trivial script.
+        '''
+        if self.driver is None:
+            return False
+        try:
+            self.driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+
+    def ensure(self):
+        '''
+        Return a working driver, (re)starting the browser if needed.
+        '''
+        if self.driver is not None and not self.is_alive():
+            print('Browser is not responding, restarting.')
+            self.restarts += 1
+            self.quit()
+        if self.driver is None:
+            self.start()
+        return self.driver
+
+
+    def get_html(self, url, prepare=None, retries: int = 1):
+        '''
+        Load a URL and return its page source.
+
+        Parameters:
+            url (str): Page to open.
+            prepare (callable): Optional function called with the driver after the page loaded (clicks, waits).
+            retries (int): How many times to restart the browser and retry after a failure.
+
+        Returns:
+            str: The page HTML or None if every attempt failed.
+        '''
+        for attempt in range(retries + 1):
+            try:
+                driver = self.ensure()
+                rate_limiter.acquire(url, PRIORITY_BACKGROUND) # politeness limit shared by every browser
+                start = time.perf_counter()
+                driver.get(url)
+                if prepare:
+                    prepare(driver)
+                html = driver.page_source
+                self.pages += 1
+                self.page_seconds += time.perf_counter() - start
+                return html
+            except Exception as e:
+                print(f'Page load failed ({attempt+1}/{retries+1}): {url}', e)
+                self.restarts += 1
+                self.quit()
+        return None
+
+
+    def stats(self):
+        return {
+            'launches': self.launches,
+            'restarts': self.restarts,
+            'avg_launch_seconds': round(self.launch_seconds / self.launches, 2) if self.launches else 0,
+            'pages': self.pages,
+            'avg_page_seconds': round(self.page_seconds / self.pages, 2) if self.pages else 0,
+        }
+
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"Browser: {s['launches']} launch(es) ({s['avg_launch_seconds']}s avg), {s['restarts']} restart(s), "
+              f"{s['pages']} page(s) ({s['avg_page_seconds']}s avg)")
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb):
+        self.quit()
+
+
+
+class SteamDB:
+    def __init__(self, headless: bool = True, browser: BrowserSession = None):
+        '''
+        Params:
+            headless (bool): Run Firefox without a window.
+            browser (BrowserSession): Optional shared browser session; by default SteamDB owns one,
+                                      which stays open until close() (or the end of a with block).
+        '''
         self.options = Options()
         self.options.binary_location = 'C:/Program Files/Mozilla Firefox/firefox.exe'
+        if headless:
+            self.options.add_argument('-headless')
+            self.options.add_argument('--width=1920')
+            self.options.add_argument('--height=1080')
 
         self.service = Service(executable_path='geckodriver.exe')
-        self.driver = None
+        self._owns_browser = browser is None
+        self.browser = browser or BrowserSession(self.options, self.service)
+
+
+    def close(self):
+        '''
+        Quit the browser if this SteamDB instance owns it.
+        '''
+        if self._owns_browser:
+            self.browser.quit()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 
     def _build_filters(self, feature='None', display_only='None', tags=None):
@@ -131,7 +475,7 @@ class SteamDB:
         '''
         Scrapes the SteamDB tags page for all user tags.
 
-        This method uses Selenium to open tags URL and parses it with BeautifulSoup.
+        This method opens the tags URL in the shared browser session and parses it with TagLabelParser.
 
         Returns:
             list[dict]: A list of dictionaries, each containing tag and it's SteamDB id:
@@ -143,48 +487,16 @@ class SteamDB:
         '''
         url = f'https://steamdb.info/tags/'
 
-        try:
-            # Open the page and maximize window
-            self.driver = webdriver.Firefox(service=self.service, options=self.options)
-            try:
-                self.driver.get(url)
-                self.driver.maximize_window()
-                # Wait for page to load
-                time.sleep(.5)
-                html = self.driver.page_source
-            except Exception as e:
-                print(e)
-            finally:
-                self.driver.quit()
-        except Exception as driver_creation_error:
-            print(f"Failed to start the driver: {driver_creation_error}")
-
-        soup = BeautifulSoup(html, 'html.parser')
-        items = soup.find_all('div', {'class': 'label'})
-
-        tags = []
-        for item in items:
-            a_tag = item.find("a")
+        # Wait for page to load
+        html = self.browser.get_html(url, lambda driver: time.sleep(.5))
+        if html is None:
+            print('error no page --> SteamDB().get_tags()')
+            return []
 
-            # Tag name (after the <span>)
-            tag_name = a_tag.get_text(strip=True).replace(a_tag.find("span").get_text(strip=True), '').strip()
-
-            # Tag ID from href
-            tag_href = a_tag['href']
-            tag_id = tag_href.split('/')[2]  # '/tag/4166/?min_reviews=500'
-
-            # Label count (e.g., 100693)
-            label_count_tag = item.find("span", class_="label-count")
-            label_count = label_count_tag.get_text(strip=True) if label_count_tag else "0"
-
-            tag = {
-                'tag': str(tag_name),
-                'id': int(tag_id),
-                'label_count': int(label_count)
-                }
- 
-            tags.append(tag)
-        return tags
+        parser = TagLabelParser()
+        parser.feed(html)
+        parser.close()
+        return parser.tags
 
 
 
@@ -192,8 +504,8 @@ class SteamDB:
         '''
         Scrapes the SteamDB page for app data.
 
-        This method uses Selenium to open a given method URL,
-        sets the table to display X entries, extracts the page HTML, and parses it with BeautifulSoup.
+        This method opens a given method URL in the shared browser session,
+        sets the table to display X entries, extracts the page HTML, and parses its rows with AppTableParser.
 
         Parameters:
             url (str): html to the site
@@ -222,79 +534,175 @@ class SteamDB:
             print('Incorrect Value! Using default: 1000 --> SteamDB().get_page()')
             value = 1000
 
-        # Open the page and maximize window
+        def show_entries(driver):
+            time.sleep(.4)
+            element = driver.find_element(By.CSS_SELECTOR, 'select[id="dt-length-0"]')
+            element.click()
+            element = driver.find_element(By.CSS_SELECTOR, f'option[value="{value}"]')
+            element.click()
+
+        html = self.browser.get_html(url, show_entries)
+        if html is None:
+            print('error no page --> SteamDB().get_page()')
+            return []
+
+
+        apps = self.parse_apps(html, section)
+        if not apps:
+            print('erorr no items')
+        return apps
+
+
+    @staticmethod
+    def parse_apps(html, section=None):
+        '''
+        Parse the <tr class="app"> rows of a SteamDB stats table (see get_page() for the dict layout).
+        '''
+        parser = AppTableParser(section)
+        parser.feed(html)
+        parser.close()
+        return parser.apps
+
+
+class ScrapePlanner:
+    '''
+    Runs a list of SteamDB scrape jobs over a bounded pool of headless browsers.
+
+    A job is a tuple (page, feature, tags, value):
+        page (str): 'toprated', 'topselling', 'trending', 'mostwishlisted' or 'tags' (user tags page, other fields ignored)
+        feature (int): SteamDB category filter, see SteamDB._build_filters() (0 = none, Co-op = 9, Multi-Player = 1)
+        tags (list): SteamDB tag IDs filter or None
+        value (int): Number of table entries (25 ... 1000)
+
+    Every worker thread owns one browser; page loads of all browsers share the steamdb.info
+    politeness limit of the rate limiter.
+
+    Usage:
+        with ScrapePlanner(drivers=3) as planner:
+            for job, data in planner.run(jobs):
+                ...
+    '''
+
+    PAGES = {
+        'toprated': 'get_toprated',
+        'topselling': 'get_topselling',
+        'trending': 'get_trending',
+        'mostwishlisted': 'get_mostwishlisted',
+    }
+
+    def __init__(self, drivers: int = None, headless: bool = True, display_only: str = 'Game'):
+        '''
+        Params:
+            drivers (int): Number of browsers running in parallel (env SCRAPER_DRIVERS, default 3).
+            headless (bool): Run Firefox without a window.
+            display_only (str): 'Game' or 'DLC' filter applied to every list job.
+        '''
+        self.drivers = drivers or int(os.getenv('SCRAPER_DRIVERS', 3))
+        self.headless = headless
+        self.display_only = display_only
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._instances = []
+
+
+    def _steamdb(self):
+        steamdb = getattr(self._local, 'steamdb', None)
+        if steamdb is None:
+            steamdb = self._local.steamdb = SteamDB(self.headless)
+            with self._lock:
+                self._instances.append(steamdb)
+        return steamdb
+
+
+    def _run_job(self, job):
+        page, feature, tags, value = job
+        steamdb = self._steamdb()
         try:
-            self.driver = webdriver.Firefox(service=self.service, options=self.options)
-            try:
-                self.driver.get(url)
-                self.driver.maximize_window()
-                time.sleep(.4)
+            if page == 'tags':
+                return steamdb.get_tags() or []
+            return getattr(steamdb, self.PAGES[page])(feature, self.display_only, tags, value) or []
+        except Exception as e:
+            print(f'Scrape job failed {job}:', e)
+            return []
 
-                element = self.driver.find_element(By.CSS_SELECTOR, 'select[id="dt-length-0"]')
-                element.click()
-                element = self.driver.find_element(By.CSS_SELECTOR, f'option[value="{value}"]')
-                element.click()
 
-                html = self.driver.page_source
-            except Exception as e:
-                print(e)
-            finally: # ALWAYS quit the driver
-                self.driver.quit()
-        except Exception as driver_creation_error:
-            print(f"Failed to start the driver: {driver_creation_error}")
+    def run(self, jobs):
+        '''
+        Run the jobs in parallel and yield (job, data) in the order of the jobs, each as soon as it
+        and every job before it are done.
+        '''
+        jobs = list(jobs)
+        with ThreadPoolExecutor(max_workers=min(self.drivers, len(jobs) or 1), thread_name_prefix='steamdb') as executor:
+            yield from zip(jobs, executor.map(self._run_job, jobs))
 
 
-        soup = BeautifulSoup(html, 'html.parser')
-        items = soup.find_all('tr', {'class': 'app'})
+    @staticmethod
+    def merge_into(unique_data: dict, job, data: list):
+        '''
+        Merge one job's rows into unique_data (appid -> app), deduplicating by appid.
 
-        is_trending = int(section == 'trending')
-        is_toprated = int(section == 'toprated')
-        is_topselling = int(section == 'topselling')
-        is_mostwishlisted = int(section == 'mostwishlisted')
+        Existing keys are only filled in when missing or empty. Positions from filtered lists
+        (feature or tags set) are ranks within that filter, not global ranks, so they are dropped.
+        '''
+        page, feature, tags, value = job
+        filtered = bool(feature or tags)
+        for app in data:
+            if filtered:
+                app = dict(app, is_trending=0, is_toprated=0, is_topselling=0, is_mostwishlisted=0)
+
+            appid = app['appid']
+            if appid not in unique_data:
+                unique_data[appid] = app
+            else:
+                # Merge: update only missing keys
+                for key, value in app.items():
+                    if key not in unique_data[appid] or not unique_data[appid][key]:
+                        unique_data[appid][key] = value
+        return unique_data
+
+
+    def scrape(self, jobs):
+        '''
+        Run the list jobs and return their merged rows, deduplicated by appid.
+        '''
+        unique_data = {}
+        for job, data in self.run(jobs):
+            if job[0] != 'tags':
+                self.merge_into(unique_data, job, data)
+        return list(unique_data.values())
+
+
+    def close(self):
+        with self._lock:
+            for steamdb in self._instances:
+                steamdb.close()
+
+
+    def print_stats(self):
+        with self._lock:
+            for i, steamdb in enumerate(self._instances):
+                print(f'  #{i+1}', end=' ')
+                steamdb.browser.print_stats()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
-        apps = []
-        if not items:
-            print('erorr no items')
-            return apps
-        
-        for item in items:
-            
-            app = {
-                'appid': int(item.get('data-appid', 0)),
-                }
-            
-            # Filter out NavigableStrings
-            tags_only = [tag for tag in item if isinstance(tag, Tag)]
-
-            # Follows table like strcutre (from SteamDB), first col (0) is Nr, second col (1) is img, third col (2) is name... etc 
-            for i, tag in enumerate(tags_only, start=0):
-                if i == 0:
-                    app['is_trending'] = int(tag.get('data-sort', 0)) if is_trending else 0
-                    app['is_toprated'] = int(tag.get('data-sort', 0)) if is_toprated else 0
-                    app['is_topselling'] = int(tag.get('data-sort', 0)) if is_topselling else 0
-                    app['is_mostwishlisted'] = int(tag.get('data-sort', 0)) if is_mostwishlisted else 0
-
-                elif i == 2:
-                    a_tag = tag.find('a')
-                    app['name'] = a_tag.get_text(strip=True) if a_tag else ''
-                elif i == 3:
-                    app['discount'] = int(tag.get('data-sort', 0))
-                elif i == 4:
-                    app['price'] = int(tag.get('data-sort', -1)) if str(tag.get('data-sort', -1)).isdigit() else -1
-                elif i == 5:
-                    app['rating'] = round(float(tag.get('data-sort', 0)))
-                elif i == 6:
-                    app['release'] = int(tag.get('data-sort', 0))
-                elif i == 7:
-                    app['follows'] = int(tag.get('data-sort', 0))
-
-            apps.append(app)
-        return apps
 
 
 class SteamAPI:
-    def __init__(self):
+    def __init__(self, priority: int = PRIORITY_INTERACTIVE):
+        '''
+        Params:
+            priority (int): Rate limiter lane, PRIORITY_INTERACTIVE (user commands) or PRIORITY_BACKGROUND (updates).
+        '''
         self.API_KEY: str = os.getenv('API_KEY')
+        self.priority = priority
+        self.session = requests.Session() # keep-alive connections reused between requests
 
 
     def get_pages_steamspy(self, start: int = 0, end: int = 1) -> list[dict]:
@@ -311,7 +719,7 @@ class SteamAPI:
         Notes:
             - Fetches data page-by-page from SteamSpy using the "all" request type.
             - Retries requests on failure using self.fetch_with_retry().
-            - Waits 60 seconds between each request to avoid hitting API rate limits.
+            - Pages are spaced 60 seconds apart by the shared rate limiter to avoid hitting API rate limits.
             - Stops early if an empty or invalid response is received.
         '''
         data = []
@@ -419,19 +827,12 @@ class SteamAPI:
             results = {}
 
         if results:
-            genres = [g.strip() for g in (results.get('genre') or '').split(',') if g.strip()]
-            tags = list(results.get('tags', {}).keys()) if isinstance(results.get('tags'), dict) else []
+            genres, tags = self._parse_categories(results)
 
             if not genres:
                 genres = self._genres_fallback(appid)
 
-            data = {
-                'appid': int(results.get('appid', 0)),
-                'name': str(results.get('name', 0)),
-                'requested_details': 1,
-                'genres': genres,
-                'tags': tags,
-            }
+            data = self._app_details(results, genres, tags)
 
             
             print('SUCCESS.' if genres and tags else 'INCOMPLETE.')
@@ -441,6 +842,33 @@ class SteamAPI:
         return {}
 
 
+    @staticmethod
+    def _parse_categories(results):
+        '''
+        Split a SteamSpy appdetails response into its genres and tags.
+
+        Returns:
+            tuple: (genres (list[str]), tags (list[str]))
+        '''
+        genres = [g.strip() for g in (results.get('genre') or '').split(',') if g.strip()]
+        tags = list(results.get('tags', {}).keys()) if isinstance(results.get('tags'), dict) else []
+        return genres, tags
+
+
+    @staticmethod
+    def _app_details(results, genres, tags):
+        '''
+        Build the item dict returned by get_app_details() from a SteamSpy appdetails response.
+        '''
+        return {
+            'appid': int(results.get('appid', 0)),
+            'name': str(results.get('name', 0)),
+            'requested_details': 1,
+            'genres': genres,
+            'tags': tags,
+        }
+
+
     def _genres_fallback(self, appid):
         '''
         Fallback for retriving app genres. Retrieve app details from the official SteamAPI (undocumented).
@@ -460,7 +888,8 @@ class SteamAPI:
         results = results.get(str(appid), {}).get('data') if results else {}
         if not results:
             try:
-                response = requests.get(redirect_url, allow_redirects=True)
+                rate_limiter.acquire(redirect_url, self.priority)
+                response = self.session.get(redirect_url, allow_redirects=True)
                 if not response.history or response.status_code != 200:
                     return []
                 
@@ -471,8 +900,6 @@ class SteamAPI:
                     print('redirect error (Index out of range) --> _genres_tags_fallback()', end=' ')
                     return []
                 
-                
-                time.sleep(.7)
                 url = f'https://store.steampowered.com/api/appdetails?appids={new_appid}'
                 results = self.fetch_with_retry(url, 1, .2, 10)
                 results = results.get(str(new_appid)).get('data')
@@ -491,6 +918,10 @@ class SteamAPI:
         '''
         Makes a GET request to the given URL with retry logic.
 
+        Fresh responses are served from the on-disk response cache; stale ones are revalidated
+        with ETag/Last-Modified when the server sent them. Every network attempt first waits for
+        its turn in the shared per-host rate limiter.
+
         Parameters:
             url (str): The API endpoint to fetch.
             retries (int): Number of retry attempts.
@@ -500,13 +931,28 @@ class SteamAPI:
         Returns:
             dict: The resulting JSON data or empty dict on failure or malformed response.
         '''
+
+        cached = response_cache.get(url)
+        if cached and cached.fresh:
+            response_cache.record_hit(cached)
+            return cached.json()
+        headers = cached.validators() if cached else {}
         
         for attempt in range(retries):
-            time.sleep(delay)
+            if attempt:
+                time.sleep(delay)
+            rate_limiter.acquire(url, self.priority)
             try:
-                response = requests.get(url)
+                response = self.session.get(url, headers=headers)
+                if response.status_code == 304 and cached:
+                    response_cache.touch(url)
+                    response_cache.record_hit(cached, revalidated=True)
+                    return cached.json()
                 if response.status_code == 200:
-                    return response.json()
+                    data = response.json()
+                    response_cache.record_miss()
+                    response_cache.store(url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                    return data
                 else:
                     print(f"Attempt failed ({attempt+1}/{retries}), next after {delay * backoff}s: Status code {response.status_code}", end='; ')
             except Exception as e:
@@ -517,5 +963,265 @@ class SteamAPI:
 
 
 
+class AsyncSteamAPI:
+    '''
+    Asynchronous counterpart of SteamAPI built on aiohttp.
+
+    All requests go through one ClientSession with a keep-alive connection pool per host,
+    and every wait (shared rate limiter, retry backoff) is non-blocking.
+
+    Usage:
+        async with AsyncSteamAPI() as api:
+            games = await api.get_user_library(steamid)
+    '''
+
+    def __init__(self, limit_per_host: int = 8, timeout: float = 30, priority: int = PRIORITY_INTERACTIVE):
+        '''
+        Params:
+            limit_per_host (int): Maximum open connections per host in the pool.
+            timeout (float): Total timeout of a single request, in seconds.
+            priority (int): Rate limiter lane, PRIORITY_INTERACTIVE (user commands) or PRIORITY_BACKGROUND (updates).
+        '''
+        self.API_KEY: str = os.getenv('API_KEY')
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.priority = priority
+        self.session = None
+
+
+    async def open(self):
+        '''
+        Create the pooled ClientSession (called automatically on first request).
+        '''
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host, keepalive_timeout=60, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+    async def __aenter__(self):
+        return await self.open()
+
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+    async def get_pages_steamspy(self, start: int = 0, end: int = 1) -> list[dict]:
+        '''
+        Fetches multiple pages of app data from the SteamSpy API. (60s polling limit)
+
+        Params:
+            start (int): The starting page number (inclusive). Default is 0.
+            end (int): The ending page number (exclusive). Default is 1.
+
+        Returns:
+            list[dict]: A list of dictionaries, each containing 'appid' and 'name' of the apps.
+        '''
+        data = []
+        for i in range(start, end):
+            print(f'AsyncSteamAPI: fetching data, page {i+1}/{end}')
+            url = f'https://steamspy.com/api.php?request=all&page={i}'
+
+            try:
+                results = await self.fetch_with_retry(url, 2, 60, 1)
+            except Exception as e:
+                print(f'request failed: --> get_pages_steamspy() ', e)
+                results = {}
+
+            if not results or not isinstance(results, dict):
+                print(f'no more data at page {i}. Stopping. --> get_pages_steamspy() ')
+                break
+
+            for item in results.values():
+                data.append({
+                    'appid': int(item.get('appid')),
+                    'name': str(item.get('name')),
+                })
+
+        return data
+
+
+    async def get_all_apps(self):
+        '''
+        Retrieve all Steam app IDs via Oficial Steam API.
+
+        Returns:
+            List of dictionaries, each representing a game
+        '''
+        url = 'https://api.steampowered.com/ISteamApps/GetAppList/v2/'
+
+        try:
+            results = await self.fetch_with_retry(url)
+        except Exception as e:
+            print('ERROR AsyncSteamAPI: request failed:', e)
+            results = {}
+
+        if results:
+            return [item for item in results.get('applist').get('apps') if item.get('name')]
+        return {}
+
+
+    async def get_user_library(self, SteamID: int):
+        '''
+        Retrieve user's Steam game library from the Steam API.
+
+        Parameters:
+            SteamID (int): The user's 64-bit Steam ID.
+
+        Returns:
+            list: A list of dictionaries, each representing a game.
+        '''
+        if not self.API_KEY:
+            raise ValueError("API key is not set.")
+
+        url: str = f'http://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/?key={self.API_KEY}&steamid={SteamID}&include_appinfo=true'
+
+        try:
+            results = await self.fetch_with_retry(url, retries=2, delay=.7, backoff=10)
+        except Exception as e:
+            print(f'ERROR AsyncSteamAPI: get_user_library() request failed. SteamID: {SteamID};', e)
+            results = {}
+
+        return results.get('response').get('games')
+
+
+    async def get_app_details(self, appid: int):
+        '''
+        Retrieve app details from the SteamSpy API.
+
+        Returns the same dictionary as SteamAPI.get_app_details() or an empty dict on failure.
+        '''
+        url = f'https://steamspy.com/api.php?request=appdetails&appid={appid}'
+
+        try:
+            results = await self.fetch_with_retry(url)
+        except Exception as e:
+            print(f'fetching details for ID: {appid} -- FAILED.', e)
+            results = {}
+
+        if results:
+            genres, tags = SteamAPI._parse_categories(results)
+
+            if not genres:
+                genres = await self._genres_fallback(appid)
+
+            print(f'fetching details for ID: {appid} --', 'SUCCESS.' if genres and tags else 'INCOMPLETE.')
+            return SteamAPI._app_details(results, genres, tags)
+
+        print(f'fetching details for ID: {appid} -- FAILED.')
+        return {}
+
+
+    async def get_many_app_details(self, appids):
+        '''
+        Fetch details for many appids concurrently; the shared rate limiter still applies.
+
+        Returns:
+            list[dict]: Details in the order of appids (empty dicts for failures).
+        '''
+        return await asyncio.gather(*(self.get_app_details(appid) for appid in appids))
+
+
+    async def _genres_fallback(self, appid):
+        '''
+        Fallback for retriving app genres. Retrieve app details from the official SteamAPI (undocumented).
+
+        Returns:
+            genres (list): A list of genres.
+        '''
+        url = f'https://store.steampowered.com/api/appdetails?appids={appid}'
+        redirect_url = f'https://store.steampowered.com/app/{appid}'
+
+        results = {}
+        try:
+            results = await self.fetch_with_retry(url, 1, .2, 10)
+        except Exception as e:
+            print(f'error --> _genres_tags_fallback()', e, end=' ')
+
+        results = results.get(str(appid), {}).get('data') if results else {}
+        if not results:
+            try:
+                await self.open()
+                await rate_limiter.acquire_async(redirect_url, self.priority)
+                async with self.session.get(redirect_url, allow_redirects=True) as response:
+                    if not response.history or response.status != 200:
+                        return []
+                    new_url = str(response.url)
+
+                try:
+                    new_appid = new_url.split('/app/')[1].split('/')[0]
+                except IndexError:
+                    print('redirect error (Index out of range) --> _genres_tags_fallback()', end=' ')
+                    return []
+
+                url = f'https://store.steampowered.com/api/appdetails?appids={new_appid}'
+                results = await self.fetch_with_retry(url, 1, .7, 10)
+                results = results.get(str(new_appid)).get('data')
+
+                if not results:
+                    return []
+
+            except Exception as e:
+                print('redirect error --> _genres_tags_fallback()', e, end=' ')
+                return []
+
+        return [genre.get('description') for genre in results.get('genres', [])]
+
+
+    async def fetch_with_retry(self, url, retries=4, delay=1.1, backoff=5):
+        '''
+        Makes a GET request to the given URL with retry logic.
+
+        Uses the same response cache and rate limiter as SteamAPI.fetch_with_retry(); the cache's SQLite
+        reads and writes run in a worker thread, so they never block the event loop.
+
+        Parameters:
+            url (str): The API endpoint to fetch.
+            retries (int): Number of retry attempts.
+            delay (float): Initial delay between attempts.
+            backoff (float): Multiplier for delay after each failed attempt.
+
+        Returns:
+            dict: The resulting JSON data or empty dict on failure or malformed response.
+        '''
+        cached = await asyncio.to_thread(response_cache.get, url)
+        if cached and cached.fresh:
+            response_cache.record_hit(cached)
+            return cached.json()
+        headers = cached.validators() if cached else {}
+
+        await self.open()
+
+        for attempt in range(retries):
+            if attempt:
+                await asyncio.sleep(delay)
+            await rate_limiter.acquire_async(url, self.priority)
+            try:
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached:
+                        await asyncio.to_thread(response_cache.touch, url)
+                        response_cache.record_hit(cached, revalidated=True)
+                        return cached.json()
+                    if response.status == 200:
+                        body = await response.read()
+                        data = json.loads(body)
+                        response_cache.record_miss()
+                        await asyncio.to_thread(response_cache.store, url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                        return data
+                    print(f"Attempt failed ({attempt+1}/{retries}), next after {delay * backoff}s: Status code {response.status}", end='; ')
+            except Exception as e:
+                print(f"Attempt {attempt+1}: Request failed - {e}")
+                return {}
+            delay *= backoff
+        return {}
+
+
 if __name__ == "__main__":
     pass
\ No newline at end of file
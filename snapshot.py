@@ -0,0 +1,418 @@
+'''
+Compact catalog snapshots (items, genres/tags and steamdb_tags) for shipping a prebuilt catalog.
+
+File layout: MAGIC, format version (2 bytes, little endian), then one zlib stream with:
+    genre dictionary, tag dictionary          sorted strings, referenced by index
+    item count, appids                        sorted, delta encoded
+    item columns                              one column after the other (name, last_updated, ITEM_COLUMNS)
+    genre lists, tag lists                    count per item, then every item's sorted dictionary indexes,
+                                              delta encoded within the item
+    steamdb_tags count, tag_ids               sorted, delta encoded, then the tag and label_count columns
+
+Integers are LEB128 varints. Nullable integers are zigzag encoded plus one (0 is NULL), nullable strings
+are stored as length plus one (0 is NULL). Everything is read in a fixed order and zlib is deterministic,
+so exporting the same database twice gives the same bytes.
+'''
+import time
+import zlib
+from connection import connections
+from catalog import current_catalog
+from database import Database
+
+
+MAGIC = b'SGRS'
+VERSION = 1
+
+ITEM_COLUMNS = (
+    'discount', 'price', 'rating', 'release', 'follows',
+    'is_trending', 'is_topselling', 'is_toprated', 'is_mostwishlisted',
+    'has_tags', 'has_genres', 'requested_details',
+)
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+
+class _Writer:
+    def __init__(self):
+        self.buf = bytearray()
+
+
+    def uints(self, values):
+        append = self.buf.append
+        for n in values:
+            while n > 0x7f:
+                append((n & 0x7f) | 0x80)
+                n >>= 7
+            append(n)
+
+
+    def uint(self, n):
+        self.uints((n,))
+
+
+    def ints(self, values):
+        '''
+        Nullable signed integers: zigzag encoded plus one, 0 is NULL.
+        '''
+        encoded = []
+        for n in values:
+            if n is None:
+                encoded.append(0)
+            elif isinstance(n, int):
+                encoded.append((n << 1 if n >= 0 else (-n << 1) - 1) + 1)
+            else:
+                raise SnapshotError(f'Can not store {n!r} as an integer')
+        self.uints(encoded)
+
+
+    def texts(self, values):
+        '''
+        Nullable strings: length plus one (0 is NULL), then the UTF-8 bytes.
+        '''
+        buf = self.buf
+        for s in values:
+            if s is None:
+                self.uint(0)
+                continue
+            data = str(s).encode('utf-8')
+            self.uint(len(data) + 1)
+            buf += data
+
+
+    def ids(self, values):
+        '''
+        Sorted non-negative integers, delta encoded.
+        '''
+        previous = 0
+        deltas = []
+        for value in values:
+            deltas.append(value - previous)
+            previous = value
+        self.uints(deltas)
+
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+
+    def uints(self, count):
+        data = self.data
+        pos = self.pos
+        values = []
+        append = values.append
+        try:
+            for _ in range(count):
+                byte = data[pos]
+                pos += 1
+                if byte < 0x80:
+                    append(byte)
+                    continue
+                result = byte & 0x7f
+                shift = 7
+                while True:
+                    byte = data[pos]
+                    pos += 1
+                    result |= (byte & 0x7f) << shift
+                    if byte < 0x80:
+                        break
+                    shift += 7
+                append(result)
+        except IndexError:
+            raise SnapshotError('Snapshot is truncated') from None
+        self.pos = pos
+        return values
+
+
+    def uint(self):
+        return self.uints(1)[0]
+
+
+    def ints(self, count):
+        return [None if not n else (n - 1) >> 1 if n & 1 else -(n >> 1) for n in self.uints(count)]
+
+
+    def texts(self, count):
+        data = self.data
+        values = []
+        for _ in range(count):
+            size = self.uint()
+            if not size:
+                values.append(None)
+                continue
+            start = self.pos
+            self.pos += size - 1
+            if self.pos > len(data):
+                raise SnapshotError('Snapshot is truncated')
+            values.append(data[start:self.pos].decode('utf-8'))
+        return values
+
+
+    def ids(self, count):
+        values = []
+        value = 0
+        for delta in self.uints(count):
+            value += delta
+            values.append(value)
+        return values
+
+
+
+def _read_tables(conn):
+    '''
+    Read everything a snapshot contains, in a fixed order (plain tuples, no sqlite3.Row overhead).
+
+    Returns:
+        tuple: (items, genres, join_genres, tags, join_tags, steamdb_tags) where genres/tags map id -> name
+               and the join lists are (appid, id) rows.
+    '''
+    cursor = conn.cursor()
+    cursor.row_factory = None
+
+    items = cursor.execute(f'''
+        SELECT appid, name, last_updated, {', '.join(ITEM_COLUMNS)}
+        FROM items
+        WHERE appid IS NOT NULL
+        ORDER BY appid
+    ''').fetchall()
+    genres = dict(cursor.execute('SELECT id, genre FROM genres WHERE genre IS NOT NULL').fetchall())
+    join_genres = cursor.execute('SELECT items_appid, genre_id FROM join_genres').fetchall()
+    tags = dict(cursor.execute('SELECT id, tag FROM tags WHERE tag IS NOT NULL').fetchall())
+    join_tags = cursor.execute('SELECT items_appid, tag_id FROM join_tags').fetchall()
+    steamdb_tags = cursor.execute('''
+        SELECT tag_id, tag, label_count FROM steamdb_tags WHERE tag_id IS NOT NULL ORDER BY tag_id
+    ''').fetchall()
+    cursor.close()
+    return items, genres, join_genres, tags, join_tags, steamdb_tags
+
+
+def encode_snapshot(items, genres, join_genres, tags, join_tags, steamdb_tags) -> bytes:
+    '''
+    Encode the rows returned by _read_tables() (see the module docstring for the layout).
+    '''
+    w = _Writer()
+
+    # Dictionaries only hold labels that are actually linked, in sorted order, so ids of the source DB do not matter
+    label_lists = []
+    for names, joins in ((genres, join_genres), (tags, join_tags)):
+        per_item = {}
+        for appid, label_id in joins:
+            if label_id in names:
+                per_item.setdefault(appid, []).append(names[label_id])
+        labels = sorted({label for item_labels in per_item.values() for label in item_labels})
+        index = {label: i for i, label in enumerate(labels)}
+        w.uint(len(labels))
+        w.texts(labels)
+        label_lists.append([sorted(index[label] for label in per_item.get(row[0], ())) for row in items])
+
+    w.uint(len(items))
+    w.ids([row[0] for row in items])
+    w.texts([row[1] for row in items])
+    w.texts([row[2] for row in items])
+    for column in range(3, 3 + len(ITEM_COLUMNS)):
+        w.ints([row[column] for row in items])
+
+    for lists in label_lists:
+        w.uints([len(labels) for labels in lists])
+        deltas = []
+        for labels in lists:
+            previous = 0
+            for label in labels:
+                deltas.append(label - previous)
+                previous = label
+        w.uints(deltas)
+
+    w.uint(len(steamdb_tags))
+    w.ids([row[0] for row in steamdb_tags])
+    w.texts([row[1] for row in steamdb_tags])
+    w.ints([row[2] for row in steamdb_tags])
+
+    return MAGIC + VERSION.to_bytes(2, 'little') + zlib.compress(bytes(w.buf), 9)
+
+
+def decode_snapshot(data: bytes) -> dict:
+    '''
+    Decode a snapshot into plain rows.
+
+    Returns:
+        dict: 'genres' and 'tags' (dictionaries), 'items' (list of dicts with the item columns and
+              'genres'/'tags' as lists of dictionary indexes) and 'steamdb_tags' (list of (tag_id, tag, label_count)).
+    '''
+    if data[:len(MAGIC)] != MAGIC:
+        raise SnapshotError('Not a catalog snapshot')
+    version = int.from_bytes(data[len(MAGIC):len(MAGIC) + 2], 'little')
+    if version != VERSION:
+        raise SnapshotError(f'Unsupported snapshot version {version} (expected {VERSION})')
+    try:
+        r = _Reader(zlib.decompress(data[len(MAGIC) + 2:]))
+    except zlib.error as e:
+        raise SnapshotError(f'Snapshot is corrupted: {e}') from None
+
+    dictionaries = [r.texts(r.uint()) for _ in range(2)]
+
+    count = r.uint()
+    appids = r.ids(count)
+    names = r.texts(count)
+    last_updated = r.texts(count)
+    columns = [r.ints(count) for _ in ITEM_COLUMNS]
+    labels = []
+    for _ in range(2):
+        counts = r.uints(count)
+        deltas = iter(r.uints(sum(counts)))
+        lists = []
+        for size in counts:
+            value = 0
+            item_labels = []
+            for _ in range(size):
+                value += next(deltas)
+                item_labels.append(value)
+            lists.append(item_labels)
+        labels.append(lists)
+
+    items = []
+    for i, appid in enumerate(appids):
+        item = {'appid': appid, 'name': names[i], 'last_updated': last_updated[i]}
+        for column, values in zip(ITEM_COLUMNS, columns):
+            item[column] = values[i]
+        item['genres'] = labels[0][i]
+        item['tags'] = labels[1][i]
+        items.append(item)
+
+    tag_count = r.uint()
+    tag_ids = r.ids(tag_count)
+    tag_names = r.texts(tag_count)
+    label_counts = r.ints(tag_count)
+
+    if r.pos != len(r.data):
+        raise SnapshotError('Unexpected data after the end of the snapshot')
+
+    return {
+        'genres': dictionaries[0],
+        'tags': dictionaries[1],
+        'items': items,
+        'steamdb_tags': list(zip(tag_ids, tag_names, label_counts)),
+    }
+
+
+def export_snapshot(path: str) -> dict:
+    '''
+    Write the catalog of the local database to a snapshot file.
+
+    Returns:
+        dict: Number of items, genres, tags and steamdb_tags exported and the file size in bytes.
+    '''
+    start = time.perf_counter()
+    conn = connections.connection()
+    began = not conn.in_transaction
+    if began:
+        conn.execute('BEGIN') # one consistent read
+    try:
+        rows = _read_tables(conn)
+    finally:
+        if began:
+            conn.commit()
+
+    data = encode_snapshot(*rows)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    items, genres, join_genres, tags, join_tags, steamdb_tags = rows
+    stats = {
+        'items': len(items),
+        'genres': len(genres),
+        'tags': len(tags),
+        'steamdb_tags': len(steamdb_tags),
+        'bytes': len(data),
+    }
+    print(f"Snapshot exported to {path}: {stats['items']} items, {stats['genres']} genres, {stats['tags']} tags, "
+          f"{stats['steamdb_tags']} SteamDB tags, {stats['bytes'] / 1024:.1f} KiB in {time.perf_counter() - start:.2f}s")
+    return stats
+
+
+def import_snapshot(path: str) -> dict:
+    '''
+    Merge a snapshot file into the local database (created or migrated first if needed).
+
+    Items are upserted by appid; a stored row is only overwritten if the snapshot row is at least as recent
+    (last_updated). has_genres/has_tags and requested_details are never cleared, genre and tag links are added.
+    SteamDB tags are upserted by tag_id. Everything is written in one transaction.
+
+    Returns:
+        dict: Number of items, genres, tags and steamdb_tags in the snapshot.
+    '''
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        snapshot = decode_snapshot(f.read())
+
+    Database.create_database()
+    items = snapshot['items']
+
+    with connections.transaction() as conn:
+        cursor = conn.cursor()
+        genre_ids = Database._resolve_ids(cursor, 'genres', 'genre', set(snapshot['genres']))
+        tag_ids = Database._resolve_ids(cursor, 'tags', 'tag', set(snapshot['tags']))
+        genre_ids = [genre_ids[genre] for genre in snapshot['genres']]
+        tag_ids = [tag_ids[tag] for tag in snapshot['tags']]
+
+        cursor.executemany(f'''
+            INSERT INTO items (appid, name, last_updated, {', '.join(ITEM_COLUMNS)})
+            VALUES ({', '.join('?' * (3 + len(ITEM_COLUMNS)))})
+            ON CONFLICT(appid) DO UPDATE SET
+                name=excluded.name,
+                discount=excluded.discount,
+                price=excluded.price,
+                rating=excluded.rating,
+                release=excluded.release,
+                follows=excluded.follows,
+                is_trending=excluded.is_trending,
+                is_topselling=excluded.is_topselling,
+                is_toprated=excluded.is_toprated,
+                is_mostwishlisted=excluded.is_mostwishlisted,
+                has_genres=COALESCE(excluded.has_genres, items.has_genres),
+                has_tags=COALESCE(excluded.has_tags, items.has_tags),
+                requested_details=CASE
+                    WHEN items.requested_details = 1 THEN 1
+                    ELSE excluded.requested_details
+                END,
+                last_updated=excluded.last_updated
+            WHERE items.last_updated IS NULL OR excluded.last_updated >= items.last_updated
+        ''', [
+            (item['appid'], item['name'], item['last_updated'], *(item[column] for column in ITEM_COLUMNS))
+            for item in items
+        ])
+
+        cursor.executemany('INSERT OR IGNORE INTO join_genres (items_appid, genre_id) VALUES (?, ?)', [
+            (item['appid'], genre_ids[i]) for item in items for i in item['genres']
+        ])
+        cursor.executemany('INSERT OR IGNORE INTO join_tags (items_appid, tag_id) VALUES (?, ?)', [
+            (item['appid'], tag_ids[i]) for item in items for i in item['tags']
+        ])
+
+        cursor.executemany('''
+            INSERT INTO steamdb_tags (tag_id, tag, label_count)
+            VALUES (?, ?, ?)
+            ON CONFLICT(tag_id) DO UPDATE SET
+                tag=excluded.tag,
+                label_count=excluded.label_count
+        ''', snapshot['steamdb_tags'])
+
+        Database.bump_catalog_generation(cursor)
+
+    # Refresh the shared snapshot if this process serves recommendations
+    if current_catalog() is not None:
+        Database.load_catalog()
+
+    stats = {
+        'items': len(items),
+        'genres': len(snapshot['genres']),
+        'tags': len(snapshot['tags']),
+        'steamdb_tags': len(snapshot['steamdb_tags']),
+    }
+    print(f"Snapshot imported from {path}: {stats['items']} items, {stats['genres']} genres, {stats['tags']} tags, "
+          f"{stats['steamdb_tags']} SteamDB tags in {time.perf_counter() - start:.2f}s")
+    return stats
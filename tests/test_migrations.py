@@ -0,0 +1,116 @@
+import sqlite3
+
+import pytest
+
+from migrations import MIGRATIONS, migrate, schema_version
+
+
+LATEST = max(version for version, _, _ in MIGRATIONS)
+
+# Schema of databases created before the migrations (including the per-row last_updated triggers)
+BASELINE_SCHEMA = '''
+CREATE TABLE items (
+    id INTEGER PRIMARY KEY,
+    appid INTEGER UNIQUE,
+    name TEXT,
+    discount INTEGER,
+    price INTEGER,
+    rating INTEGER,
+    release INTEGER,
+    follows INTEGER,
+    is_trending INTEGER,
+    is_topselling INTEGER,
+    is_toprated INTEGER,
+    is_mostwishlisted INTEGER,
+    has_tags INTEGER,
+    has_genres INTEGER,
+    requested_details INTEGER,
+    last_updated TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE steamdb_tags (id INTEGER PRIMARY KEY, tag_id INTEGER UNIQUE, tag TEXT, label_count INTEGER);
+CREATE TABLE join_genres (
+    items_appid INTEGER,
+    genre_id INTEGER,
+    PRIMARY KEY (items_appid, genre_id),
+    FOREIGN KEY (items_appid) REFERENCES items(appid) ON DELETE CASCADE,
+    FOREIGN KEY (genre_id) REFERENCES genres(id) ON DELETE CASCADE
+);
+CREATE TABLE genres (id INTEGER PRIMARY KEY, genre TEXT UNIQUE);
+CREATE TABLE join_tags (
+    items_appid INTEGER,
+    tag_id INTEGER,
+    PRIMARY KEY (items_appid, tag_id),
+    FOREIGN KEY (items_appid) REFERENCES items(appid) ON DELETE CASCADE,
+    FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
+);
+CREATE TABLE tags (id INTEGER PRIMARY KEY, tag TEXT UNIQUE);
+CREATE TRIGGER update_items_last_updated
+AFTER UPDATE ON items
+FOR EACH ROW
+BEGIN
+    UPDATE items SET last_updated = datetime('now') WHERE id = OLD.id;
+END;
+CREATE TRIGGER insert_items_last_updated
+AFTER INSERT ON items
+FOR EACH ROW
+BEGIN
+    UPDATE items SET last_updated = datetime('now') WHERE id = NEW.id;
+END;
+'''
+
+
+def query_plan(conn, query, params=()):
+    return ' | '.join(row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params))
+
+
+@pytest.fixture
+def migrated(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'localdb.db', isolation_level=None)
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+def test_fresh_database_ends_at_latest_version(migrated):
+    assert schema_version(migrated) == LATEST
+    tables = {row[0] for row in migrated.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {'items', 'genres', 'tags', 'join_genres', 'join_tags', 'steamdb_tags', 'meta', 'recommendations'} <= tables
+
+    # Running it again is a no-op
+    assert migrate(migrated) == LATEST
+
+
+def test_baseline_database_upgrades_cleanly(tmp_path):
+    path = tmp_path / 'localdb.db'
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO items (appid, name, is_trending, release) VALUES (10, 'Game', 3, 1700000000)")
+    conn.execute("INSERT INTO genres (genre) VALUES ('Action')")
+    conn.execute('INSERT INTO join_genres VALUES (10, 1)')
+    conn.commit()
+    assert schema_version(conn) == 0
+    conn.close()
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    assert migrate(conn) == LATEST
+    assert schema_version(conn) == LATEST
+
+    triggers = conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall()
+    assert triggers == []
+    assert conn.execute('SELECT appid, name FROM items').fetchall() == [(10, 'Game')]
+    assert conn.execute("SELECT value FROM meta WHERE key = 'catalog_generation'").fetchone() == (0,)
+    assert 'idx_items_trending' in query_plan(conn, 'SELECT appid FROM items WHERE is_trending BETWEEN 1 AND 150 AND release > 0')
+    conn.close()
+
+
+def test_trending_window_uses_covering_index(migrated):
+    plan = query_plan(migrated, 'SELECT appid FROM items WHERE is_trending BETWEEN 1 AND 150 AND release > 0')
+    assert 'COVERING INDEX idx_items_trending' in plan
+
+
+@pytest.mark.parametrize('query, index', [
+    ('SELECT jg.items_appid FROM genres g JOIN join_genres jg ON jg.genre_id = g.id WHERE g.genre = ?', 'idx_join_genres_genre'),
+    ('SELECT jt.items_appid FROM tags t JOIN join_tags jt ON jt.tag_id = t.id WHERE t.tag = ?', 'idx_join_tags_tag'),
+])
+def test_genre_and_tag_lookups_use_indexes(migrated, query, index):
+    assert index in query_plan(migrated, query, ('Action',))
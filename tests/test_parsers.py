@@ -0,0 +1,40 @@
+import json
+import os
+
+import pytest
+
+from scraper import SteamDB, AppTableParser, TagLabelParser
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+# Expected dicts were produced by the BeautifulSoup parsing get_page()/get_tags() used before the streaming parsers
+@pytest.mark.parametrize('section, key', [('trending', 'trending'), ('toprated', 'toprated'), (None, 'none')])
+def test_parse_apps_matches_saved_table(section, key):
+    expected = json.loads(fixture('steamdb_trending.json'))[key]
+    assert SteamDB.parse_apps(fixture('steamdb_trending.html'), section) == expected
+
+
+def test_parse_apps_fed_in_chunks():
+    # The tokenizer keeps its state between feeds, rows split across chunks parse the same
+    html = fixture('steamdb_trending.html')
+    parser_apps = SteamDB.parse_apps(html, 'trending')
+
+    parser = AppTableParser('trending')
+    for i in range(0, len(html), 257):
+        parser.feed(html[i:i + 257])
+    parser.close()
+    assert parser.apps == parser_apps
+
+
+def test_tag_label_parser_matches_saved_page():
+    parser = TagLabelParser()
+    parser.feed(fixture('steamdb_tags.html'))
+    parser.close()
+    assert parser.tags == json.loads(fixture('steamdb_tags.json'))
@@ -0,0 +1,114 @@
+import copy
+import random
+
+import pytest
+
+from profiler import Profiler
+
+
+NOW = 1750000000
+DAY = 24 * 60 * 60
+
+
+def baseline_profile(games, current_unix_time):
+    '''
+    Per-game loops of Profiler.build_profile() before like_scores() (they wrote the scores into the game dicts).
+
+    Returns:
+        tuple: (like scores in library order, recent_interests, total_playtime, last2weeks_playtime)
+    '''
+    max_days = 365
+    total_playtime = 0
+    last2weeks_playtime = 0
+    for game in games:
+        total_playtime += game.get('playtime_forever', 0)
+        last2weeks_playtime += game.get('playtime_2weeks', 0)
+
+    for game in games:
+        game_playtime = game.get('playtime_forever', 0)
+        try:
+            playtime_ratio = game_playtime / total_playtime
+        except ZeroDivisionError:
+            playtime_ratio = 0
+        game['playtime_ratio'] = round(playtime_ratio, 6)
+
+    for game in games:
+        game_playtime = game.get('playtime_2weeks', 0)
+        try:
+            last2weeks_playtime_ratio = game_playtime / last2weeks_playtime
+        except ZeroDivisionError:
+            last2weeks_playtime_ratio = 0
+        game['last2weeks_playtime_ratio'] = round(last2weeks_playtime_ratio, 6)
+
+    for game in games:
+        rtime_last_played = game.get('rtime_last_played', 0)
+        if rtime_last_played == 0:
+            score = 0.1
+        else:
+            days_since_played = (current_unix_time - rtime_last_played) / (24 * 60 * 60)
+            score = max(0.1, 1 - (days_since_played / max_days))
+        game['recently_played_score'] = round(score, 3)
+
+    for game in games:
+        playtime_ratio = game.get('playtime_ratio', 0)
+        last2weeks_playtime_ratio = game.get('last2weeks_playtime_ratio', 0)/10
+        last_played = game.get('recently_played_score', 0)
+        game['like_score'] = round(playtime_ratio * last_played + last2weeks_playtime_ratio, 5)
+
+    all_games = sorted(games, key=lambda app: app['like_score'], reverse=True)
+    recent_interests = [
+        {'appid': game.get('appid'), 'name': game.get('name'), 'like_score': game.get('like_score')}
+        for game in all_games[:15]
+    ]
+    return [game['like_score'] for game in games], recent_interests, total_playtime, last2weeks_playtime
+
+
+def library(seed: int, size: int, zero_playtime: bool = False, zero_recent: bool = False):
+    '''
+    Synthetic library: mostly unplayed games, repeated playtimes (ties), never played (rtime_last_played 0),
+    played long ago and "played" in the future (clock skew).
+    '''
+    rng = random.Random(seed)
+    games = []
+    for i in range(size):
+        game = {
+            'appid': (i + 1) * 10,
+            'name': f'Game {i}',
+            'playtime_forever': 0 if zero_playtime else rng.choice([0, 0, 0, 60, 60, rng.randint(1, 50), rng.randint(0, 20000)]),
+            'playtime_2weeks': 0 if zero_recent else rng.choice([0] * 8 + [30, rng.randint(1, 900)]),
+            'rtime_last_played': rng.choice([0, 0, NOW - 3 * DAY, NOW - rng.randint(0, 900) * DAY, NOW + 50]),
+        }
+        if rng.random() < 0.05:
+            del game['playtime_2weeks']     # the API leaves it out for games not played recently
+        games.append(game)
+    return games
+
+
+@pytest.mark.parametrize('size', [0, 1, 15, 16, 300, 3000])
+@pytest.mark.parametrize('zero_playtime, zero_recent', [(False, False), (True, False), (False, True), (True, True)])
+def test_profile_matches_per_game_formulas(size, zero_playtime, zero_recent):
+    profiler = Profiler()
+    profiler.current_time = NOW
+
+    for seed in range(3):
+        games = library(seed, size, zero_playtime, zero_recent)
+        like_scores, recent_interests, total, last2weeks = baseline_profile(copy.deepcopy(games), NOW)
+
+        scores = profiler.like_scores(games)
+        assert scores == (like_scores, total, last2weeks)
+        assert [type(score) for score in scores[0]] == [type(score) for score in like_scores]
+
+        profile = profiler.build_profile('user', libraries={'user': games})['user']
+        assert profile['recent_interests'] == recent_interests
+        assert (profile['total_playtime'], profile['last2weeks_playtime']) == (total, last2weeks)
+        assert profile['played_appids'] == [game['appid'] for game in games]
+
+
+def test_like_scores_of_some_games_use_library_totals():
+    profiler = Profiler()
+    profiler.current_time = NOW
+    games = library(7, 500)
+    like_scores, total, last2weeks = profiler.like_scores(games)
+
+    some = games[100:140]
+    assert profiler.like_scores(some, totals=(total, last2weeks)) == (like_scores[100:140], total, last2weeks)
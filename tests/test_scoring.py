@@ -0,0 +1,164 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from catalog import Catalog, TRENDING_MAX_RANK
+from scoring import ScoringEngine, MAX_COMBINATION_LABELS
+
+
+NOW = 1750000000
+GENRES = [f'Genre {i}' for i in range(12)]
+TAGS = [f'Tag {i}' for i in range(40)]
+
+
+def make_catalog(seed: int = 4, size: int = 600):
+    '''
+    Deterministic catalog with few genres per item, so equal scores (ties) are common.
+    '''
+    rng = random.Random(seed)
+    items = []
+    for i in range(size):
+        items.append(SimpleNamespace(
+            appid=(i + 1) * 10,
+            name=f'Game {i}',
+            genres=rng.sample(GENRES, rng.randint(0, 3)),
+            tags=rng.sample(TAGS, rng.randint(0, 6)),
+            is_trending=rng.choice([0, rng.randint(1, TRENDING_MAX_RANK), rng.randint(TRENDING_MAX_RANK + 1, 400)]),
+            release=rng.choice([0, rng.randint(NOW - 10 ** 8, NOW + 10 ** 6)]),
+        ))
+    return Catalog(items)
+
+
+def full_sort(engine, vector, played=(), current_time=None):
+    '''
+    Reference ranking: score every row by summing the weights of its labels (vector order), then sort everything.
+    '''
+    catalog = engine.catalog
+    masked = set(played)
+    ranked = []
+    for row, appid in enumerate(engine.row_appids):
+        item = catalog.get(appid)
+        labels = set(item.genres) | set(item.tags)
+        matched = [weight for label, weight in vector.items() if weight and label in labels and engine.columns.get(label)]
+        if not matched:
+            continue
+        if appid in masked:
+            continue
+        if current_time is not None and engine.row_release[row] > current_time:
+            continue
+        score = 0.0
+        for weight in matched:
+            score += weight
+        ranked.append((row, score))
+    ranked.sort(key=lambda x: (-x[1], x[0]))
+    return [(engine.row_appids[row], score) for row, score in ranked]
+
+
+def vectors(rng, labels, count: int, sizes, weights):
+    return [{label: rng.choice(weights) for label in rng.sample(labels, rng.randint(*sizes))} for _ in range(count)]
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return make_catalog()
+
+
+@pytest.mark.parametrize('trending_only', [True, False])
+@pytest.mark.parametrize('k', [None, 0, 1, 3, 10, 50, 10000])
+def test_score_matches_full_sort(catalog, trending_only, k):
+    engine = ScoringEngine(catalog, trending_only=trending_only)
+    rng = random.Random(k or 0)
+    labels = GENRES + TAGS
+
+    cases = (
+        # Profile vectors (top genres, weight 1): mostly ties
+        vectors(rng, GENRES, 20, (1, 5), [1])
+        # Weighted vectors, including negative and fractional weights
+        + vectors(rng, labels, 20, (0, MAX_COMBINATION_LABELS), [1, 1, 2, 0.5, 0.3, -0.5, 0])
+        # More labels than MAX_COMBINATION_LABELS (accumulation path)
+        + vectors(rng, labels, 10, (MAX_COMBINATION_LABELS + 1, MAX_COMBINATION_LABELS + 8), [1, 2, 0.3, -0.5])
+    )
+    for vector in cases:
+        played = rng.sample(engine.row_appids, min(25, len(engine.row_appids)))
+        current_time = rng.choice([None, NOW])
+
+        expected = full_sort(engine, vector, played, current_time)
+        if k is not None:
+            expected = expected[:k]
+
+        ranked = engine.score({'user': vector}, {'user': played}, current_time, k)['user']
+        assert ranked == expected
+
+
+def test_ties_keep_catalog_order(catalog):
+    engine = ScoringEngine(catalog)
+    ranked = engine.score({'user': {genre: 1 for genre in GENRES[:5]}}, current_time=NOW, limit=None)['user']
+
+    assert len({score for _, score in ranked}) < len(ranked)    # the fixture has ties
+    keys = [(-score, catalog.position[appid]) for appid, score in ranked]
+    assert keys == sorted(keys)
+
+
+def test_scores_do_not_depend_on_other_users(catalog):
+    engine = ScoringEngine(catalog)
+    a = {'Genre 1': 0.3, 'Genre 2': 0.3, 'Genre 3': 2}
+    b = {'Genre 3': 2, 'Genre 2': 0.3, 'Genre 1': 0.3}
+
+    alone = engine.score({'a': a}, current_time=NOW, limit=20)['a']
+    together = engine.score({'b': b, 'a': a}, current_time=NOW, limit=20)['a']
+    assert alone == together
+
+
+def baseline_recommend(catalog, interests, played_appids, current_time):
+    '''
+    Ranking loop of Profiler.recommend() before the ScoringEngine (per-user genre averages over genres only,
+    top 5 genres, one point per matching genre or tag, stable sort), top 10.
+    '''
+    like_scores = {}
+    for interest in interests:
+        like_scores.setdefault(interest['appid'], interest['like_score'])
+
+    genre_totals = {}
+    genre_counts = {}
+    for item in catalog.get_items([interest['appid'] for interest in interests]):
+        for genre in list(set(item.genres)):
+            genre_totals[genre] = genre_totals.get(genre, 0.0) + like_scores[item.appid]
+            genre_counts[genre] = genre_counts.get(genre, 0) + 1
+    genre_averages = {genre: round(genre_totals[genre] / genre_counts[genre], 6) for genre in genre_totals}
+    top_genres = list(dict(sorted(genre_averages.items(), key=lambda x: x[1], reverse=True)))[:5]
+
+    recommendations = []
+    for item in catalog.get_items():
+        if item.appid in played_appids:
+            continue
+        if not (1 <= item.is_trending <= 150):
+            continue
+        release_unix = item.release if item.release else 0
+        if not (0 < release_unix <= current_time):
+            continue
+        match_score = len(set(top_genres) & set(item.genres + item.tags))
+        if match_score > 0:
+            recommendations.append((item, match_score))
+    recommendations.sort(key=lambda x: x[1], reverse=True)
+    return [(item.appid, score) for item, score in recommendations[:10]]
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_profile_pipeline_matches_baseline_recommend(seed):
+    rng = random.Random(seed)
+    items = make_catalog(seed=seed).items
+    for item in items:
+        item.tags = item.tags + rng.sample(GENRES, rng.randint(0, 2))  # user tags named like genres also score
+    catalog = Catalog(items)
+    engine = ScoringEngine(catalog)
+
+    for _ in range(10):
+        owned = rng.sample([item.appid for item in catalog.items], 40)
+        interests = [{'appid': appid, 'like_score': rng.choice([0.0, 0.05, 0.1, 0.1, 0.25, 0.5, 1.0])} for appid in owned[:15]]
+        played = set(owned)
+
+        expected = baseline_recommend(catalog, interests, played, NOW)
+        vector = engine.profile_vector(engine.genre_averages(interests), top_n=5)
+        ranked = engine.score({'user': vector}, {'user': played}, NOW, limit=10)['user']
+        assert ranked == expected
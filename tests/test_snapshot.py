@@ -0,0 +1,164 @@
+import zlib
+
+import pytest
+
+from connection import connections
+from database import Database
+from snapshot import MAGIC, VERSION, ITEM_COLUMNS, SnapshotError, encode_snapshot, decode_snapshot, _read_tables, export_snapshot, import_snapshot
+
+
+# appid, name, last_updated, then ITEM_COLUMNS
+ITEMS = [
+    (10, 'Half-Life', '2026-01-02 10:00:00', 0, 999, 96, 911433600, 120000, 1, 0, 1, 0, 1, 1, 1),
+    (20, 'Pokémon ✨ ゲーム', '2026-01-02 10:00:00', -40, -1, None, None, 0, 150, None, None, 0, 0, 1, 0),
+    (30, None, None, None, None, None, None, None, None, None, None, None, None, None, None),
+    (2 ** 31 + 5, '', '2026-01-03 00:00:00', 100, 2 ** 40, 0, -5, None, 0, 1, 0, 1, None, None, None),
+]
+GENRES = {10: ['Action', 'Shooter'], 20: ['Aventure é'], 2 ** 31 + 5: ['Action']}
+TAGS = {10: ['FPS', 'Classic', 'Co-op'], 20: ['ゲーム']}
+STEAMDB_TAGS = [(19, 'Action', 30000), (3859, 'Multiplayer', None), (1662, 'Survival', -1)]
+
+
+@pytest.fixture
+def database(tmp_path):
+    '''
+    Point the shared connection manager at a fresh database, restoring the previous one afterwards.
+    '''
+    previous = connections.path
+
+    def use(name):
+        connections.configure(str(tmp_path / name))
+        Database.create_database()
+        return connections.connection()
+
+    yield use
+    connections.configure(previous)
+
+
+def fill(conn, items=ITEMS, genres=GENRES, tags=TAGS, steamdb_tags=STEAMDB_TAGS):
+    with conn:
+        conn.executemany(f'''
+            INSERT INTO items (appid, name, last_updated, {', '.join(ITEM_COLUMNS)})
+            VALUES ({', '.join('?' * (3 + len(ITEM_COLUMNS)))})
+        ''', items)
+        for table, column, join, links in (('genres', 'genre', 'join_genres', genres), ('tags', 'tag', 'join_tags', tags)):
+            for appid, labels in links.items():
+                for label in labels:
+                    conn.execute(f'INSERT OR IGNORE INTO {table} ({column}) VALUES (?)', (label,))
+                    conn.execute(f'INSERT INTO {join} VALUES (?, (SELECT id FROM {table} WHERE {column} = ?))', (appid, label))
+        conn.executemany('INSERT INTO steamdb_tags (tag_id, tag, label_count) VALUES (?, ?, ?)', steamdb_tags)
+
+
+def catalog_rows(conn):
+    '''
+    Everything a snapshot carries, with labels by name so database ids do not matter.
+    '''
+    items, genres, join_genres, tags, join_tags, steamdb_tags = _read_tables(conn)
+    links = {}
+    for names, joins in ((genres, join_genres), (tags, join_tags)):
+        for appid, label_id in joins:
+            links.setdefault(appid, set()).add(names[label_id])
+    return [tuple(row) for row in items], links, [tuple(row) for row in steamdb_tags]
+
+
+def test_round_trip_keeps_every_value(database, tmp_path):
+    source = database('source.db')
+    fill(source)
+    path = str(tmp_path / 'catalog.sgrs')
+    export_snapshot(path)
+
+    snapshot = decode_snapshot(open(path, 'rb').read())
+    assert [tuple(item[column] for column in ('appid', 'name', 'last_updated', *ITEM_COLUMNS)) for item in snapshot['items']] == ITEMS
+    assert sorted(snapshot['steamdb_tags']) == sorted(STEAMDB_TAGS)
+
+    expected = catalog_rows(source)
+    target = database('target.db')
+    import_snapshot(path)
+    assert catalog_rows(target) == expected
+
+
+def test_reexport_is_byte_identical(database, tmp_path):
+    database('source.db')
+    fill(connections.connection())
+    first = str(tmp_path / 'first.sgrs')
+    export_snapshot(first)
+
+    database('target.db')
+    import_snapshot(first)
+    second = str(tmp_path / 'second.sgrs')
+    export_snapshot(second)
+
+    assert open(first, 'rb').read() == open(second, 'rb').read()
+
+
+def test_second_import_is_idempotent(database, tmp_path):
+    database('source.db')
+    fill(connections.connection())
+    path = str(tmp_path / 'catalog.sgrs')
+    export_snapshot(path)
+
+    target = database('target.db')
+    import_snapshot(path)
+    rows = catalog_rows(target)
+    counts = [target.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in ('items', 'genres', 'tags', 'join_genres', 'join_tags')]
+
+    import_snapshot(path)
+    assert catalog_rows(target) == rows
+    assert [target.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in ('items', 'genres', 'tags', 'join_genres', 'join_tags')] == counts
+
+
+def test_older_snapshot_does_not_overwrite_newer_rows(database, tmp_path):
+    old = [(10, 'Old name', '2026-01-01 00:00:00', *ITEMS[0][3:]), (40, 'Only in snapshot', '2026-01-01 00:00:00', *ITEMS[0][3:])]
+    database('source.db')
+    fill(connections.connection(), items=old, genres={}, tags={}, steamdb_tags=[])
+    path = str(tmp_path / 'old.sgrs')
+    export_snapshot(path)
+
+    target = database('target.db')
+    fill(target, items=[ITEMS[0]], genres={}, tags={}, steamdb_tags=[])
+    import_snapshot(path)
+
+    names = dict(target.execute('SELECT appid, name FROM items').fetchall())
+    assert names == {10: 'Half-Life', 40: 'Only in snapshot'}
+
+
+def test_import_bumps_the_catalog_generation(database, tmp_path):
+    database('source.db')
+    fill(connections.connection())
+    path = str(tmp_path / 'catalog.sgrs')
+    export_snapshot(path)
+
+    database('target.db')
+    before = Database.get_catalog_generation()
+    import_snapshot(path)
+    assert Database.get_catalog_generation() == before + 1
+
+
+def snapshot_bytes():
+    links = [(appid, label) for appid, labels in GENRES.items() for label in labels]
+    genres = {i: label for i, label in enumerate(sorted({label for _, label in links}))}
+    ids = {label: i for i, label in genres.items()}
+    return encode_snapshot(ITEMS, genres, [(appid, ids[label]) for appid, label in links], {}, [], sorted(STEAMDB_TAGS))
+
+
+def test_truncated_snapshot_is_rejected():
+    data = snapshot_bytes()
+    decode_snapshot(data)
+
+    with pytest.raises(SnapshotError):
+        decode_snapshot(data[:-4])  # cut zlib stream
+
+    payload = zlib.decompress(data[len(MAGIC) + 2:])
+    with pytest.raises(SnapshotError, match='truncated'):
+        decode_snapshot(data[:len(MAGIC) + 2] + zlib.compress(payload[:-3]))
+
+    with pytest.raises(SnapshotError):
+        decode_snapshot(data[:len(MAGIC) + 1])
+
+
+def test_wrong_magic_or_version_is_rejected():
+    data = snapshot_bytes()
+    with pytest.raises(SnapshotError, match='version'):
+        decode_snapshot(MAGIC + (VERSION + 1).to_bytes(2, 'little') + data[len(MAGIC) + 2:])
+    with pytest.raises(SnapshotError, match='Not a catalog snapshot'):
+        decode_snapshot(b'XXXX' + data[len(MAGIC):])